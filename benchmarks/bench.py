@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark suite for WPS pin generators and public entry points.
+
+Measures ops/sec and peak allocated memory (tracemalloc) over fixed MAC
+corpora and checks the generated pins against the golden digests, so
+performance work can't silently change the output.
+
+Usage: python benchmarks/bench.py [--quick] [--count N] [--rows N] [--json FILE] [--update-golden]
+'''
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wpspin.wpspin import WPSpin, SUGGEST_TABLE, NetworkAddress, stream_pins  # noqa: E402
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden.json')
+SEED = 0x5EED
+
+
+def random_macs(count, seed=SEED):
+    rnd = random.Random(seed)
+    return [rnd.getrandbits(48) for _ in range(count)]
+
+
+def known_oui_macs(count, seed=SEED):
+    '''MACs under the prefixes from the suggestion table'''
+    rnd = random.Random(seed)
+    prefixes = sorted(set(p for masks in SUGGEST_TABLE.values() for p in masks))
+    macs = []
+    for i in range(count):
+        prefix = prefixes[i % len(prefixes)]
+        bits = 4 * (12 - len(prefix))
+        macs.append((int(prefix, 16) << bits) | rnd.getrandbits(bits))
+    return macs
+
+
+def golden_corpus():
+    return random_macs(500) + known_oui_macs(500)
+
+
+def golden_digests(generator):
+    '''
+    SHA-256 of the pins of every algorithm over the golden corpus,
+    of the public entry points and of the batch and sweep reimplementations
+    '''
+    corpus = golden_corpus()
+    macs = [NetworkAddress(mac).string for mac in corpus]
+    res = {}
+    for ID in generator.algos:
+        digest = hashlib.sha256()
+        for mac in macs:
+            digest.update(generator.generate(ID, mac).encode('ascii') + b'\n')
+        res[ID] = digest.hexdigest()
+    for name, method in (('getAll', generator.getAll), ('getSuggested', generator.getSuggested)):
+        digest = hashlib.sha256()
+        for mac in macs:
+            digest.update(json.dumps([dict(item) for item in method(mac)]).encode('utf-8') + b'\n')
+        res[name] = digest.hexdigest()
+    # The NumPy path if NumPy is available, and the pure Python one
+    batch = [ID for ID, algo in generator.algos.items() if algo['mode'] != WPSpin.ALGO_EMPTY]
+    for name, method in (
+            ('generate_many', generator.generate_many),
+            ('generate_many/fallback', lambda ID, macs: generator._generate_many_fallback(generator.algos[ID], macs))):
+        digest = hashlib.sha256()
+        for ID in batch:
+            for pin in method(ID, corpus):
+                digest.update('{:08d}\n'.format(int(pin)).encode('ascii'))
+        res[name] = digest.hexdigest()
+    # 16 MACs from every corpus MAC and across the NIC wrap of its OUI
+    digest = hashlib.sha256()
+    for mac in corpus:
+        for start in (mac, (mac | 0xFFFFFF) - 7):
+            start = min(start, 0x1000000000000 - 16)
+            for record in generator.sweep(start, 16):
+                digest.update('{:012X} {} {:08d}\n'.format(*record).encode('ascii'))
+    res['sweep'] = digest.hexdigest()
+    return res
+
+
+def measure(func, items, repeat=3):
+    '''
+    Run func over every item
+    Returns the dict with best ops/sec and peak allocated bytes of a single pass
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'ops_per_sec': len(items) / best if best else 0.0, 'peak_bytes': peak}
+
+
+def bench_cli(mac, repeat=5):
+    '''Median wall time of the whole `wpspin MAC` process'''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', 'from wpspin.wpspin import main; main()', mac],
+            cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'seconds': times[len(times) // 2]}
+
+
+def bench_file(generator, rows):
+    '''Stream suggested pins for the file of `rows` MACs'''
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+        path = file.name
+        for mac in random_macs(rows, SEED + 1):
+            file.write(NetworkAddress(mac).string + '\n')
+    try:
+        start = time.perf_counter()
+        with open(path) as file:
+            count = sum(1 for _ in stream_pins(file, generator=generator))
+        elapsed = time.perf_counter() - start
+    finally:
+        os.remove(path)
+    return {'rows': count, 'ops_per_sec': count / elapsed if elapsed else 0.0}
+
+
+def run(count, rows):
+    generator = WPSpin()
+    corpora = {'random': random_macs(count), 'known_oui': known_oui_macs(count)}
+    results = {'python': sys.version.split()[0], 'corpus_size': count, 'benchmarks': {}}
+    bench = results['benchmarks']
+    for corpus, macs in corpora.items():
+        strings = [NetworkAddress(mac).string for mac in macs]
+        for ID, algo in generator.algos.items():
+            bench['gen/{}/{}'.format(ID, corpus)] = measure(algo['gen'], macs)
+        bench['generate/pin24/{}'.format(corpus)] = measure(lambda mac: generator.generate('pin24', mac), strings)
+        bench['_suggest/{}'.format(corpus)] = measure(generator._suggest, strings)
+        bench['getAll/{}'.format(corpus)] = measure(generator.getAll, strings[:max(1, count // 10)])
+        bench['getSuggested/{}'.format(corpus)] = measure(generator.getSuggested, strings)
+    bench['sweep/256'] = measure(
+        lambda start: sum(1 for _ in generator.sweep(start, 256)),
+        [mac & ~0xFFFFFF for mac in corpora['known_oui'][:max(1, count // 256)]])
+    bench['checksum'] = measure(generator.checksum, [mac % 10000000 for mac in corpora['random']])
+    bench['cli_startup'] = bench_cli('54:A0:50:75:D2:40')
+    if rows:
+        bench['file/getSuggested'] = bench_file(generator, rows)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='wpspin benchmark suite')
+    parser.add_argument('--quick', action='store_true', help='small corpora and no file benchmark')
+    parser.add_argument('--count', type=int, help='MACs per corpus. Default: 10000, 1000 with --quick')
+    parser.add_argument('--rows', type=int, help='rows of the MAC file. Default: 1000000, 0 with --quick')
+    parser.add_argument('--json', metavar='FILE', help='write machine-readable results to the file')
+    parser.add_argument('--update-golden', action='store_true', help='store the current output as golden')
+    args = parser.parse_args()
+
+    generator = WPSpin()
+    digests = golden_digests(generator)
+    if args.update_golden:
+        with open(GOLDEN, 'w') as file:
+            json.dump(digests, file, indent=1, sort_keys=True)
+            file.write('\n')
+        print('Golden digests updated: {}'.format(GOLDEN))
+        return
+    with open(GOLDEN) as file:
+        golden = json.load(file)
+    changed = sorted(ID for ID in golden if digests.get(ID) != golden[ID])
+    if changed:
+        print('Golden output mismatch: {}'.format(', '.join(changed)), file=sys.stderr)
+        sys.exit(1)
+    print('Golden output check passed')
+
+    if args.count is None:
+        args.count = 1000 if args.quick else 10000
+    if args.rows is None:
+        args.rows = 0 if args.quick else 1000000
+    results = run(args.count, args.rows)
+    for name, result in sorted(results['benchmarks'].items()):
+        print('{:<40} {}'.format(name, '  '.join(
+            '{}={:.6g}'.format(key, value) for key, value in sorted(result.items()))))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
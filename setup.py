@@ -29,7 +29,7 @@ setup(
     keywords='wireless wifi wpa wps generator pin code',
 
     packages=['wpspin'],
-    python_requires='>=3.4',
+    python_requires='>=3.7',
     entry_points={
         'console_scripts': [
             'wpspin = wpspin.wpspin:main'
@@ -42,10 +42,10 @@ setup(
         'Topic :: Security',
         'Topic :: Utilities',
         'Operating System :: OS Independent',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ]
 )
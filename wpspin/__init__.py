@@ -8,3 +8,24 @@ from .wpspin import WPSpin
 
 __author__ = 'drygdryg'
 __version__ = '0.2'
+
+# The optional subsystems are imported on first access to keep the CLI startup fast
+_LAZY = {
+    'ReverseLookup': 'reverse',
+    'PinIndex': 'reverse',
+    'PinDatabase': 'pindb',
+    'PinStats': 'ranking',
+    'Profiler': 'profiling',
+    'AsyncWPSpin': 'aio',
+    'PinTableWriter': 'columnar',
+    'read_table': 'columnar',
+    'write_table': 'columnar',
+    'DataFile': 'datafile'
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module('.' + _LAZY[name], __name__), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+from .wpspin import WPSpin, _mac_integer, _parse_line
+
+
+class AsyncWPSpin():
+    '''
+    asyncio facade of WPSpin.
+    Requests made during one event loop iteration are computed
+    as a single batch in the executor, so the loop is never blocked.
+    Concurrent requests for the same MAC, in any notation, share one computation
+    and get the same result object. Invalid MACs raise ValueError
+    @generator — WPSpin instance to use
+    @max_batch — maximum number of MACs computed in one batch
+    @max_pending — maximum number of distinct MACs in flight,
+    the further requests wait for a free slot
+    @executor — concurrent.futures executor, the loop's default one if None
+    '''
+    def __init__(self, generator=None, max_batch=256, max_pending=4096, executor=None):
+        self.generator = generator or WPSpin()
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.executor = executor
+        # (method, MAC) → future of the in-flight computation
+        self._pending = {}
+        self._batch = []
+        self._flush_handle = None
+        self._slots = None
+
+    async def suggest(self, mac):
+        '''Async getSuggested'''
+        return await self._submit('getSuggested', mac)
+
+    async def getAll(self, mac):
+        '''Async getAll'''
+        return await self._submit('getAll', mac)
+
+    async def watch_data(self, interval=1.0):
+        '''
+        Reload the generator's data file on change, checking every `interval` seconds.
+        The tables are compiled in the executor, the requests are served meanwhile
+        '''
+        import sys
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await loop.run_in_executor(self.executor, self.generator.reload_data):
+                    print('Reloaded {}'.format(self.generator.data.path), file=sys.stderr)
+            except (OSError, ValueError) as e:
+                print('Failed to reload data file: {}'.format(e), file=sys.stderr)
+
+    async def _submit(self, method, mac):
+        key = (method, _mac_integer(mac))
+        future = self._pending.get(key)
+        if future is None:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_pending)
+            await self._slots.acquire()
+            # Could be submitted by another request while waiting for the slot
+            future = self._pending.get(key)
+            if future is not None:
+                self._slots.release()
+            else:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                future.add_done_callback(lambda _: self._slots.release())
+                self._pending[key] = future
+                self._batch.append(key)
+                if len(self._batch) >= self.max_batch:
+                    self._flush()
+                elif self._flush_handle is None:
+                    self._flush_handle = loop.call_soon(self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    def _compute(self, batch):
+        results = []
+        # MACs are parsed to integers by _submit
+        for method, mac in batch:
+            try:
+                results.append((True, getattr(self.generator, method)(mac)))
+            except Exception as e:
+                results.append((False, e))
+        return results
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self._compute, batch)
+        except Exception as e:
+            results = [(False, e)] * len(batch)
+        for key, (ok, value) in zip(batch, results):
+            future = self._pending.pop(key)
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+async def _handle_client(service, reader, writer, queue_size=256):
+    '''
+    One request per line: MAC address or JSON {"mac": MAC, "all": bool}.
+    MACs must be 12 hex digits, optionally separated by ':', '-' or '.'.
+    One JSON response per line, in request order:
+    {"mac": MAC, "pins": [...]} or {"mac": MAC, "error": message}
+    '''
+    queue = asyncio.Queue(queue_size)
+
+    async def respond(request):
+        request = request.strip()
+        get_all = False
+        if request.startswith(b'{'):
+            try:
+                data = json.loads(request.decode('utf-8'))
+                mac, get_all = str(data['mac']), bool(data.get('all', False))
+            except (ValueError, KeyError, TypeError):
+                return {'error': 'Invalid request'}
+        else:
+            mac = request.decode('utf-8', 'replace')
+        try:
+            # The workers' input is untrusted: no lenient NetworkAddress notations
+            value = _parse_line(mac)
+            pins = await (service.getAll(value) if get_all else service.suggest(value))
+        except ValueError as e:
+            return {'mac': mac, 'error': str(e)}
+        return {'mac': mac, 'pins': [dict(pin) for pin in pins]}
+
+    async def write_responses():
+        while True:
+            task = await queue.get()
+            if task is None:
+                break
+            writer.write(json.dumps(await task, ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    writer_task = asyncio.ensure_future(write_responses())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                # Blocks reading when too many responses are queued
+                await queue.put(asyncio.ensure_future(respond(line)))
+        await queue.put(None)
+        await writer_task
+    finally:
+        writer_task.cancel()
+        writer.close()
+
+
+async def serve(address, service=None):
+    '''
+    Serve pins over a local socket, so many workers share one warm generator
+    @address — Unix socket path or HOST:PORT
+    '''
+    service = service or AsyncWPSpin()
+
+    def handler(reader, writer):
+        return _handle_client(service, reader, writer)
+    watcher = None
+    if service.generator.data is not None:
+        watcher = asyncio.ensure_future(service.watch_data())
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        server = await asyncio.start_server(handler, host or None, int(port))
+    else:
+        server = await asyncio.start_unix_server(handler, address)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import json
+import struct
+
+from .wpspin import WPSpin, _parse_line, _import_numpy
+
+
+class PinTableWriter():
+    '''
+    Streaming writer of the columnar pin table: one record per MAC
+    instead of a dict per pin.
+
+    File layout (little-endian): b'WPSPTAB1', uint32 header size,
+    JSON header {"algos": [algo ID, …]}, zero padding to 8 bytes,
+    then for every MAC a record of uint64 MAC and uint32 pin (8 digits,
+    as integer) of every algo in the header order
+    '''
+    MAGIC = b'WPSPTAB1'
+
+    def __init__(self, file, algos):
+        self.file = file
+        self.algos = list(algos)
+        self.count = 0
+        header = json.dumps({'algos': self.algos}).encode('utf-8')
+        file.write(self.MAGIC + struct.pack('<I', len(header)) + header)
+        file.write(b'\0' * (-(12 + len(header)) % 8))
+        self._record = struct.Struct('<Q{}I'.format(len(self.algos)))
+
+    def write(self, macs, pins):
+        '''
+        Append the records
+        @macs — MACs as integers (sequence or NumPy array)
+        @pins — their pins as returned by WPSpin.getAll_table for the same algos
+        '''
+        np = _import_numpy()
+        if np is not None and isinstance(pins, np.ndarray):
+            records = np.empty(len(macs), dtype=record_dtype(np, len(self.algos)))
+            records['mac'] = macs
+            records['pins'] = pins.reshape(len(macs), len(self.algos))
+            self.file.write(records.tobytes())
+        else:
+            width = len(self.algos)
+            for i, mac in enumerate(macs):
+                self.file.write(self._record.pack(mac, *pins[i * width:(i + 1) * width]))
+        self.count += len(macs)
+
+
+def record_dtype(np, count):
+    '''NumPy structured dtype of the pin table record with `count` pins'''
+    return np.dtype([('mac', '<u8'), ('pins', '<u4', (count,))])
+
+
+def read_table(path):
+    '''
+    Load the pin table written by PinTableWriter
+    Returns (algo IDs, MACs, pins): NumPy uint64 array and (MACs × algos)
+    uint32 array, memory-mapped, if NumPy is available,
+    otherwise array.array('Q') and row-major array.array('I')
+    '''
+    with open(path, 'rb') as file:
+        head = file.read(12)
+        if head[:8] != PinTableWriter.MAGIC:
+            raise ValueError('Not a WPS pin table file: {}'.format(path))
+        size, = struct.unpack_from('<I', head, 8)
+        algos = json.loads(file.read(size).decode('utf-8'))['algos']
+        data = 12 + size + (-(12 + size) % 8)
+        np = _import_numpy()
+        if np is not None:
+            records = np.memmap(path, dtype=record_dtype(np, len(algos)), mode='r', offset=data)
+            return algos, records['mac'], records['pins']
+        from array import array
+        file.seek(data)
+        macs, pins = array('Q'), array('I')
+        for record in struct.iter_unpack('<Q{}I'.format(len(algos)), file.read()):
+            macs.append(record[0])
+            pins.extend(record[1:])
+        return algos, macs, pins
+
+
+def write_table(lines, file, generator=None, get_static=True, chunksize=65536):
+    '''
+    Write the pin table of MAC addresses read line by line
+    @lines — iterable of lines (e.g. file object), one MAC per line
+    @file — binary file object
+    Invalid MACs are reported to stderr and skipped
+    Returns the number of written records
+    '''
+    import itertools
+    import sys
+
+    if generator is None:
+        generator = WPSpin()
+    lines = iter(lines)
+    writer = None
+    while True:
+        chunk = list(itertools.islice(lines, chunksize))
+        if not chunk:
+            break
+        macs = []
+        for line in chunk:
+            mac = line.strip()
+            if not mac:
+                continue
+            try:
+                macs.append(_parse_line(mac))
+            except ValueError:
+                print('Skipping invalid MAC address: {}'.format(mac), file=sys.stderr)
+        if not macs:
+            continue
+        algos, pins = generator.getAll_table(macs, get_static)
+        if writer is None:
+            writer = PinTableWriter(file, algos)
+        writer.write(macs, pins)
+    if writer is None:
+        algos, _ = generator.getAll_table([], get_static)
+        writer = PinTableWriter(file, algos)
+    return writer.count
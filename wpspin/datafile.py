@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+from types import MappingProxyType
+
+from .wpspin import ALGORITHMS, ALGO_MAC, ALGO_STATIC, SUGGEST_TABLE, PrefixIndex, _ALGORITHMS_VIEW, _algorithm
+
+
+class DataFile():
+    '''
+    External algorithm and OUI database, JSON or TOML (Python 3.11+) file:
+    {"algorithms": {algo ID: {"name": name, "pin": 7 digit static pin}
+                    or {"name": name, "algorithm": built-in MAC-based algo ID}},
+     "suggest": {algo ID: [MAC prefix, …]},
+     "replace_suggest": false}
+    The loaded algorithms are added to the registered ones, replacing the same IDs.
+    The prefixes are added to the built-in suggestion table, or replace it
+    if replace_suggest is true.
+    Compiled tables: self.tables — (read-only algos mapping, PrefixIndex or None for the built-in one)
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.tables = (_ALGORITHMS_VIEW, None)
+        self._stamp = None
+        self._algorithms = {}
+        self._suggest = None
+        self.reload(True)
+
+    def _read(self):
+        if self.path.endswith('.toml'):
+            try:
+                import tomllib
+            except ImportError:
+                raise ValueError('TOML data files require Python 3.11+')
+            with open(self.path, 'rb') as file:
+                return tomllib.load(file)
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def reload(self, force=False):
+        '''
+        Reload the file if its modification time or size has changed.
+        Only the changed sections are recompiled. On error the old tables are kept
+        Returns True if the tables have changed
+        '''
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp and not force:
+            return False
+        data = self._read()
+        self._stamp = stamp
+        algorithms = data.get('algorithms', {})
+        suggest = (data.get('suggest', {}), bool(data.get('replace_suggest', False)))
+        algos, index = self.tables
+        if algorithms != self._algorithms:
+            algos = self._compile_algos(algorithms)
+        if suggest != self._suggest:
+            index = self._compile_index(*suggest)
+        unknown = set(index.ids if index is not None else SUGGEST_TABLE) - set(algos)
+        if unknown:
+            raise ValueError('Unknown algorithms in suggestions: {}'.format(', '.join(sorted(unknown))))
+        self._algorithms, self._suggest = algorithms, suggest
+        if algos is self.tables[0] and index is self.tables[1]:
+            return False
+        # Single assignment: readers see either the old or the new tables
+        self.tables = (algos, index)
+        return True
+
+    @staticmethod
+    def _compile_algos(algorithms):
+        if not algorithms:
+            return _ALGORITHMS_VIEW
+        algos = dict(ALGORITHMS)
+        for ID, entry in algorithms.items():
+            name = entry.get('name', ID)
+            if 'pin' in entry:
+                pin = int(entry['pin'])
+                if not 0 <= pin < 10000000:
+                    raise ValueError('Static pin of {} must be 7 digits without checksum'.format(ID))
+                algos[ID] = _algorithm(name, ALGO_STATIC, lambda mac, pin=pin: pin)
+            elif 'algorithm' in entry:
+                base = ALGORITHMS.get(entry['algorithm'])
+                if base is None or base['mode'] != ALGO_MAC:
+                    raise ValueError('Unknown MAC-based algorithm: {}'.format(entry['algorithm']))
+                algos[ID] = MappingProxyType(dict(base, name=name))
+            else:
+                raise ValueError('Algorithm {} must have either "pin" or "algorithm"'.format(ID))
+        return MappingProxyType(algos)
+
+    @staticmethod
+    def _compile_index(suggest, replace=False):
+        if not suggest and not replace:
+            return None
+        table = {} if replace else {ID: list(masks) for ID, masks in SUGGEST_TABLE.items()}
+        for ID, masks in suggest.items():
+            for mask in masks:
+                mask = mask.replace(':', '').replace('-', '').replace('.', '').upper()
+                if not mask or mask.strip('0123456789ABCDEF'):
+                    raise ValueError('Invalid MAC prefix of {}: {}'.format(ID, mask))
+                table.setdefault(ID, []).append(mask)
+        return PrefixIndex(table)
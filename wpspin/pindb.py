@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+import struct
+
+from .wpspin import WPSpin, SUGGEST_TABLE, _import_numpy
+from .reverse import _parse_prefix
+
+
+class PinDatabase():
+    '''
+    Precomputed pins of every MAC under the given prefixes, accessed via mmap.
+
+    File layout (little-endian): b'WPSPDB01', uint32 header size,
+    JSON header {"sections": [{"algo", "prefix", "offset", "count"}, …]},
+    zero padding to 4 bytes, then for every section `count` uint32 pins
+    (8 digits, as integers) indexed by the MAC offset from the prefix base
+    '''
+    MAGIC = b'WPSPDB01'
+
+    def __init__(self, path):
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != self.MAGIC:
+            raise ValueError('Not a WPS pin database file: {}'.format(path))
+        size, = struct.unpack_from('<I', self._mmap, 8)
+        self.sections = json.loads(self._mmap[12:12 + size].decode('utf-8'))['sections']
+        data = 12 + size + (-size % 4)
+        # algo ID → {number of free bits: {prefix value: section offset}}
+        self._offsets = {}
+        for section in self.sections:
+            value, bits = _parse_prefix(section['prefix'])
+            tables = self._offsets.setdefault(section['algo'], {})
+            tables.setdefault(bits, {})[value] = data + section['offset']
+
+    def close(self):
+        self._mmap.close()
+
+    @classmethod
+    def build(cls, path, algos=None, prefixes=None, generator=None):
+        '''
+        Build the database file
+        @algos — algo IDs to precompute, all MAC-based ones by default
+        @prefixes — MAC prefixes (hex strings, at least OUI) to precompute for every algo.
+        By default the algo's own prefixes from the suggestion table are used.
+        Each OUI takes 64 MiB per algo; NumPy makes the building much faster
+        '''
+        if generator is None:
+            generator = WPSpin()
+        if algos is None:
+            algos = [ID for ID, algo in generator.algos.items() if algo['mode'] == generator.ALGO_MAC]
+        sections = []
+        offset = 0
+        for algo in algos:
+            for prefix in (prefixes if prefixes is not None else SUGGEST_TABLE.get(algo, ())):
+                value, bits = _parse_prefix(prefix)
+                if bits > 24:
+                    raise ValueError('MAC prefix is too short to precompute: {}'.format(prefix))
+                sections.append({'algo': algo, 'prefix': prefix, 'offset': offset, 'count': 1 << bits})
+                offset += 4 << bits
+        header = json.dumps({'sections': sections}).encode('utf-8')
+        np = _import_numpy()
+        with open(path, 'wb') as file:
+            file.write(cls.MAGIC + struct.pack('<I', len(header)) + header)
+            file.write(b'\0' * (-len(header) % 4))
+            for section in sections:
+                value, bits = _parse_prefix(section['prefix'])
+                base, count = value << bits, 1 << bits
+                if np is not None:
+                    pins = generator.generate_many(
+                        section['algo'], np.arange(base, base + count, dtype=np.uint64))
+                    file.write(pins.astype('<u4').tobytes())
+                else:
+                    pins = generator.generate_many(section['algo'], range(base, base + count))
+                    file.write(b''.join(struct.pack('<I', pin) for pin in pins))
+
+    def lookup(self, algo, mac):
+        '''
+        Get the precomputed pin
+        @mac — MAC address as integer
+        Returns the 8 digit pin as integer or None if the MAC is not covered
+        '''
+        for bits, offsets in self._offsets.get(algo, {}).items():
+            offset = offsets.get(mac >> bits)
+            if offset is not None:
+                return struct.unpack_from('<I', self._mmap, offset + 4 * (mac & ((1 << bits) - 1)))[0]
+        return None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Precompute WPS PIN database for the MAC prefixes',
+        epilog='Example: %(prog)s pins.db -a pin24 pinASUS -p 54A050'
+    )
+    parser.add_argument(
+        'output',
+        help='database file to write'
+        )
+    parser.add_argument(
+        '-a', '--algos',
+        nargs='+',
+        help='algorithm IDs to precompute. Default: all MAC-based ones'
+        )
+    parser.add_argument(
+        '-p', '--prefixes',
+        nargs='+',
+        help='MAC prefixes (at least OUI) to precompute. Default: suggested ones for every algorithm'
+        )
+
+    args = parser.parse_args()
+    PinDatabase.build(args.output, args.algos, args.prefixes)
+
+
+if __name__ == '__main__':
+    main()
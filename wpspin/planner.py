@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+
+def plan_attempts(candidates):
+    '''
+    Schedule the pin attempts by the WPS half-pin checks.
+    The access point checks the first 4 digits of the pin in M4
+    and the last 4 ones in M6, so a failed M4 rejects every candidate
+    with the same first half, and a passed M4 rejects every other first half.
+    Exchange probabilities assume exactly one of the candidates is correct,
+    with the probability proportional to its score.
+    The empty pin is not checked by halves, so it is reported separately
+    and left out of the groups and the exchange counts
+    @candidates — distinct pins with scores, as returned by WPSpin.getRanked
+    Returns the dict:
+    'groups' — [{'half', 'probability', 'pins': [candidate, …]}, …] in attempt order,
+    'pins' — number of distinct pins,
+    'expected' — expected number of exchanges,
+    'max' — number of exchanges in the worst case,
+    'naive' — expected number of exchanges trying the pins one by one in score order,
+    'empty' — the empty pin candidate or None
+    '''
+    empty = None
+    for candidate in candidates:
+        if candidate['pin'] == '':
+            empty = candidate
+    candidates = sorted(
+        (candidate for candidate in candidates if candidate['pin'] != ''),
+        key=lambda candidate: candidate['score'], reverse=True)
+    total = sum(candidate['score'] for candidate in candidates)
+
+    def probability(candidate):
+        if total:
+            return candidate['score'] / total
+        return 1 / len(candidates)
+
+    groups = {}
+    for candidate in candidates:
+        half = candidate['pin'][:4]
+        if half not in groups:
+            groups[half] = {'half': half, 'probability': 0.0, 'pins': []}
+        groups[half]['probability'] += probability(candidate)
+        groups[half]['pins'].append(candidate)
+    groups = sorted(groups.values(), key=lambda group: group['probability'], reverse=True)
+
+    expected = 0.0
+    worst = 0
+    for i, group in enumerate(groups):
+        # One failed M4 exchange per every previous group
+        for k, candidate in enumerate(group['pins'], 1):
+            expected += probability(candidate) * (i + k)
+        worst = max(worst, i + len(group['pins']))
+    naive = sum(probability(candidate) * i for i, candidate in enumerate(candidates, 1))
+    return {
+        'groups': groups,
+        'pins': len(candidates),
+        'expected': expected,
+        'max': worst,
+        'naive': naive,
+        'empty': empty
+    }
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import time
+
+
+class Profiler():
+    '''
+    Call counters and cumulative time of the generation stages and algorithms.
+    Stages: parse (MAC parsing), suggest (prefix matching),
+    format (checksum and pin formatting), generate_many (batch generation);
+    algorithm time is spent in the `gen` callables and pin database lookups
+    '''
+    def __init__(self):
+        # name → [calls, nanoseconds]
+        self.stages = {}
+        self.algos = {}
+
+    @staticmethod
+    def add(table, key, ns):
+        counter = table.get(key)
+        if counter is None:
+            counter = table[key] = [0, 0]
+        counter[0] += 1
+        counter[1] += ns
+
+    def wrap(self, stage, func):
+        '''Returns func accounted to the stage'''
+        clock = time.perf_counter_ns
+        stages = self.stages
+        add = self.add
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(stages, stage, clock() - start)
+        return wrapper
+
+    def reset(self):
+        self.stages.clear()
+        self.algos.clear()
+
+    def stats(self):
+        '''
+        Get the collected counters
+        Returns the dict: {'stages': {stage: {'calls', 'ns'}}, 'algos': {algo ID: {'calls', 'ns'}}}
+        '''
+        return {
+            name: {key: {'calls': calls, 'ns': ns} for key, (calls, ns) in table.items()}
+            for name, table in (('stages', self.stages), ('algos', self.algos))
+        }
+
+    def report(self, out):
+        '''Write the counters as a table, the slowest first'''
+        out.write('{:<20} {:>10} {:>12} {:>10}\n'.format('Stage/algorithm', 'Calls', 'Total ms', 'ns/call'))
+        for table in (self.stages, self.algos):
+            for key, (calls, ns) in sorted(table.items(), key=lambda item: item[1][1], reverse=True):
+                out.write('{:<20} {:>10} {:>12.3f} {:>10.0f}\n'.format(key, calls, ns / 1e6, ns / calls))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+
+class PinStats():
+    '''
+    Empirical per OUI and per algorithm success statistics.
+    Stored as JSON: {"algos": {algo ID: [hits, tries]},
+    "ouis": {OUI: {algo ID: [hits, tries]}}}
+    '''
+    # Weight of the prior estimate, in tries
+    PSEUDO_COUNT = 2
+    # Prior success probability of the algos suggested for the MAC and the rest
+    SUGGESTED_PRIOR = 0.5
+    DEFAULT_PRIOR = 0.01
+
+    def __init__(self, path=None):
+        self.path = path
+        self.algos = {}
+        self.ouis = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            self.algos = data.get('algos', {})
+            self.ouis = data.get('ouis', {})
+
+    @staticmethod
+    def _oui(mac):
+        return '{:06X}'.format(mac >> 24)
+
+    def probability(self, mac, algo, suggested=False):
+        '''
+        Estimate the success probability of the algo for the MAC
+        @mac — MAC address as integer
+        @suggested — the algo is suggested for the MAC
+        '''
+        w = self.PSEUDO_COUNT
+        base = self.SUGGESTED_PRIOR if suggested else self.DEFAULT_PRIOR
+        hits, tries = self.algos.get(algo, (0, 0))
+        prior = (hits + w * base) / (tries + w)
+        hits, tries = self.ouis.get(self._oui(mac), {}).get(algo, (0, 0))
+        return (hits + w * prior) / (tries + w)
+
+    def record(self, mac, algos, success):
+        '''
+        Record the attempt of a pin
+        @mac — MAC address as integer
+        @algos — IDs of all the algos producing the pin
+        @success — the pin was correct
+        '''
+        ouis = self.ouis.setdefault(self._oui(mac), {})
+        for algo in algos:
+            for table in (self.algos, ouis):
+                hits, tries = table.get(algo, (0, 0))
+                table[algo] = [hits + bool(success), tries + 1]
+
+    def save(self, path=None):
+        '''Atomically write the statistics to the file'''
+        path = path or self.path
+        if path is None:
+            raise ValueError('Statistics file path is not set')
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as file:
+            json.dump({'algos': self.algos, 'ouis': self.ouis}, file, sort_keys=True)
+        os.replace(tmp, path)
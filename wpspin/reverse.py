@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+import json
+import struct
+from math import gcd
+
+from . import wpspin as _core
+from .wpspin import WPSpin, SUGGEST_TABLE, _import_numpy, _reverse_bytes, _NIBSWAP_TABLE, _BITREV_TABLE
+
+_PIN_SPACE = 10000000
+_NIC_SPACE = 0x1000000
+
+
+def _modinv(a, m):
+    '''Modular inverse of a (mod m), a and m must be coprime'''
+    x0, x1, r0, r1 = 1, 0, a % m, m
+    while r1:
+        q = r0 // r1
+        r0, r1 = r1, r0 - q * r1
+        x0, x1 = x1, x0 - q * x1
+    return x0 % m
+
+
+def _solve_linear(pin, base, mult, lo=0, hi=_NIC_SPACE):
+    '''
+    Solve (base + mult * x) % 10^7 == pin
+    Returns every solution x in [lo, hi)
+    '''
+    c = (pin - base) % _PIN_SPACE
+    mult %= _PIN_SPACE
+    g = gcd(mult, _PIN_SPACE)
+    if c % g:
+        return []
+    step = _PIN_SPACE // g
+    x = (c // g) * _modinv(mult // g, step) % step
+    return list(range(lo + (x - lo) % step, hi, step))
+
+
+def _inv_dlink(pin):
+    '''NICs producing the 7 digit D-Link pin (independent of OUI)'''
+    # Values before the pin % 10^7 step
+    values = []
+    if pin >= 1000000:
+        values += range(pin, _NIC_SPACE, _PIN_SPACE)
+        d, r = divmod(pin, 1000000)
+        if r % 9 + 1 == d:
+            values += range(r, _NIC_SPACE, _PIN_SPACE)
+    nics = []
+    for value in values:
+        # The low nibble is not changed by the mixing step
+        pin = value ^ ((value & 0xF) * 0x111110)
+        nics.append(pin ^ 0x55AA55)
+    return nics
+
+
+def _inv_oui_sub_nic(oui, pin):
+    nics = _solve_linear(pin, oui, -1, 0, oui)
+    if pin == 0 and oui < _NIC_SPACE:
+        nics.append(oui)
+    return nics + _solve_linear(pin, oui + _NIC_SPACE, -1, oui + 1)
+
+
+def _inv_reversed(table, width):
+    '''
+    Reverse byte/nibble/bit algorithms of `width` bits:
+    the reversed NIC takes the upper 24 bits of the value, the reversed
+    remainder of the MAC (OUI part) takes the lower bits
+    '''
+    rest = (width - 24) // 8
+
+    def inverse(oui, pin):
+        base = _reverse_bytes(oui, rest, table) if rest else 0
+        return [_reverse_bytes(x, 3, table) for x in _solve_linear(pin, base, 1 << (8 * rest))]
+    return inverse
+
+
+# Analytical inverses of the MAC-based algorithms:
+# algo ID → function(OUI, 7 digit pin) returning every matching NIC
+ANALYTIC_INVERSES = {
+    'pin24': lambda oui, pin: _solve_linear(pin, 0, 1),
+    'pin28': lambda oui, pin: _solve_linear(pin, (oui << 24) & 0xFFFFFFF, 1),
+    'pin32': lambda oui, pin: _solve_linear(pin, (oui << 24) & 0xFFFFFFFF, 1),
+    'pin36': lambda oui, pin: _solve_linear(pin, (oui << 24) & 0xFFFFFFFFF, 1),
+    'pin40': lambda oui, pin: _solve_linear(pin, (oui << 24) & 0xFFFFFFFFFF, 1),
+    'pin44': lambda oui, pin: _solve_linear(pin, (oui << 24) & 0xFFFFFFFFFFF, 1),
+    'pin48': lambda oui, pin: _solve_linear(pin, oui << 24, 1),
+    'pin24rh': _inv_reversed(None, 24),
+    'pin32rh': _inv_reversed(None, 32),
+    'pin48rh': _inv_reversed(None, 48),
+    'pin24rn': _inv_reversed(_NIBSWAP_TABLE, 24),
+    'pin32rn': _inv_reversed(_NIBSWAP_TABLE, 32),
+    'pin48rn': _inv_reversed(_NIBSWAP_TABLE, 48),
+    'pin24rb': _inv_reversed(_BITREV_TABLE, 24),
+    'pin32rb': _inv_reversed(_BITREV_TABLE, 32),
+    'pin48rb': _inv_reversed(_BITREV_TABLE, 48),
+    'pinDLink': lambda oui, pin: _inv_dlink(pin),
+    'pinDLink1': lambda oui, pin: [(nic - 1) & 0xFFFFFF for nic in _inv_dlink(pin)],
+    'pinInvNIC': lambda oui, pin: _solve_linear(pin, 0xFFFFFF, -1),
+    'pinNIC2': lambda oui, pin: _solve_linear(pin, 0, 2),
+    'pinNIC3': lambda oui, pin: _solve_linear(pin, 0, 3),
+    'pinOUIaddNIC': lambda oui, pin: _solve_linear(pin, oui, 1),
+    'pinOUIsubNIC': _inv_oui_sub_nic,
+    'pinOUIxorNIC': lambda oui, pin: [x ^ oui for x in _solve_linear(pin, 0, 1)]
+}
+# The same by the generator function, so the algos registered
+# under other IDs (e.g. data file aliases) are solved too
+_GEN_INVERSES = {getattr(_core, ID): inverse for ID, inverse in ANALYTIC_INVERSES.items()}
+
+
+def _suggest_prefixes(tables):
+    '''
+    Get the suggestion prefixes of the generator tables
+    Returns the dict: algo ID → prefixes at least OUI long
+    '''
+    index = tables[1]
+    table = index.prefixes if index is not None else SUGGEST_TABLE
+    # Shorter prefixes cover too many OUIs to solve
+    return {ID: [mask for mask in masks if len(mask) >= 6] for ID, masks in table.items()}
+
+
+def _parse_prefix(prefix):
+    '''
+    Parse MAC prefix, at least OUI long
+    Returns (prefix value, number of the free low bits)
+    '''
+    prefix = prefix.replace(':', '').replace('-', '').replace('.', '').upper()
+    if not 6 <= len(prefix) <= 12:
+        raise ValueError('MAC prefix must be from 6 to 12 hex digits: {}'.format(prefix))
+    return int(prefix, 16), 4 * (12 - len(prefix))
+
+
+def _parse_pin(pin):
+    '''Returns the 8 digit pin as integer'''
+    pin = str(pin)
+    if len(pin) != 8 or not pin.isdigit():
+        raise ValueError('WPS pin must be 8 digits')
+    return int(pin)
+
+
+class PinIndex():
+    '''
+    On-disk index of the pins produced by an algorithm for every MAC
+    under a prefix, sorted by pin and accessed via mmap.
+
+    File layout (little-endian): b'WPSPIDX1', uint32 header size,
+    JSON header {"sections": [{"algo", "prefix", "offset", "count"}, …]},
+    zero padding to 4 bytes, then for every section `count` uint32 pins (8 digits, sorted)
+    followed by `count` uint32 MAC offsets from the prefix base
+    '''
+    MAGIC = b'WPSPIDX1'
+
+    def __init__(self, path):
+        import mmap
+
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != self.MAGIC:
+            raise ValueError('Not a WPS pin index file: {}'.format(path))
+        size, = struct.unpack_from('<I', self._mmap, 8)
+        self.sections = json.loads(self._mmap[12:12 + size].decode('utf-8'))['sections']
+        # Section offsets are relative to the 4-byte aligned data start
+        self._data = 12 + size + (-size % 4)
+
+    def close(self):
+        self._mmap.close()
+
+    @classmethod
+    def build(cls, path, algos, prefixes=None, generator=None):
+        '''
+        Build the index file
+        @algos — algo IDs to index
+        @prefixes — MAC prefixes (hex strings, at least OUI) to index for every algo.
+        By default the algo's own prefixes from the generator's suggestion table are used.
+        Each OUI takes 128 MiB; NumPy makes the building much faster
+        '''
+        if generator is None:
+            generator = WPSpin()
+        suggest = _suggest_prefixes(generator._tables)
+        sections = []
+        for algo in algos:
+            for prefix in (prefixes if prefixes is not None else suggest.get(algo, ())):
+                value, bits = _parse_prefix(prefix)
+                if bits > 24:
+                    raise ValueError('MAC prefix is too short to index: {}'.format(prefix))
+                sections.append({'algo': algo, 'prefix': prefix, 'count': 1 << bits})
+        offset = 0
+        for section in sections:
+            section['offset'] = offset
+            offset += 8 * section['count']
+        header = json.dumps({'sections': sections}).encode('utf-8')
+        with open(path, 'wb') as file:
+            file.write(cls.MAGIC + struct.pack('<I', len(header)) + header)
+            file.write(b'\0' * (-len(header) % 4))
+            for section in sections:
+                value, bits = _parse_prefix(section['prefix'])
+                cls._write_section(file, generator, section['algo'], value << bits, 1 << bits)
+
+    @staticmethod
+    def _write_section(file, generator, algo, base, count):
+        np = _import_numpy()
+        if np is not None:
+            pins = generator.generate_many(algo, np.arange(base, base + count, dtype=np.uint64))
+            order = np.argsort(pins, kind='stable')
+            file.write(pins[order].astype('<u4').tobytes())
+            file.write(order.astype('<u4').tobytes())
+            return
+        from array import array
+        import sys
+        pins = generator.generate_many(algo, range(base, base + count))
+        order = sorted(range(count), key=pins.__getitem__)
+        for values in (array('I', (pins[i] for i in order)), array('I', order)):
+            if sys.byteorder == 'big':
+                values.byteswap()
+            file.write(values.tobytes())
+
+    def lookup(self, algo, pin):
+        '''
+        Find the MACs for which the algo produces the pin
+        @pin — 8 digit pin as integer
+        Returns the list of MACs as integers
+        '''
+        res = []
+        for section in self.sections:
+            if section['algo'] != algo:
+                continue
+            value, bits = _parse_prefix(section['prefix'])
+            offset, count = self._data + section['offset'], section['count']
+            # Lower bound binary search over the sorted pins
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if struct.unpack_from('<I', self._mmap, offset + 4 * mid)[0] < pin:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            while lo < count and struct.unpack_from('<I', self._mmap, offset + 4 * lo)[0] == pin:
+                nic, = struct.unpack_from('<I', self._mmap, offset + 4 * (count + lo))
+                res.append((value << bits) + nic)
+                lo += 1
+        return res
+
+
+class ReverseLookup():
+    '''
+    Find the algorithms and MACs which could produce the given pin.
+    Invertible algorithms are solved analytically,
+    the rest are looked up in the optional PinIndex
+    '''
+    def __init__(self, generator=None, index=None):
+        self.generator = generator or WPSpin()
+        if isinstance(index, str):
+            index = PinIndex(index)
+        self.index = index
+
+    def find(self, pin, prefixes=None):
+        '''
+        @pin — 8 digit WPS pin
+        @prefixes — MAC prefixes (hex strings, at least OUI) to check every
+        algorithm against. By default every algorithm is checked against
+        its own prefixes from the generator's suggestion table
+        Returns the list of (algo ID, MAC as integer) tuples.
+        MAC is None for static pins
+        '''
+        pin = _parse_pin(pin)
+        if self.generator.checksum(pin // 10) != pin % 10:
+            raise ValueError('Invalid WPS pin checksum')
+        # Read once, so the algos and prefixes are from the same data file load
+        tables = self.generator._tables
+        if prefixes is None:
+            suggest = _suggest_prefixes(tables)
+        res = []
+        for ID, algo in tables[0].items():
+            if algo['mode'] == self.generator.ALGO_EMPTY:
+                continue
+            if algo['mode'] == self.generator.ALGO_STATIC:
+                if algo['gen'](None) % _PIN_SPACE == pin // 10:
+                    res.append((ID, None))
+                continue
+            masks = prefixes if prefixes is not None else suggest.get(ID, ())
+            inverse = _GEN_INVERSES.get(algo['gen']) if algo.get('invertible') else None
+            if inverse is not None:
+                macs = set()
+                for mask in masks:
+                    value, bits = _parse_prefix(mask)
+                    oui = value >> (24 - bits)
+                    for nic in inverse(oui, pin // 10):
+                        mac = (oui << 24) | nic
+                        if mac >> bits == value:
+                            macs.add(mac)
+                res.extend((ID, mac) for mac in sorted(macs))
+            elif self.index is not None:
+                res.extend((ID, mac) for mac in self.index.lookup(ID, pin))
+        return res
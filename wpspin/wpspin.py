@@ -1,23 +1,36 @@
 # -*- coding: utf-8 -*-
+import time
+from types import MappingProxyType
+
+_import_start = time.perf_counter()
+
+
 class NetworkAddress():
+    '''
+    MAC address stored as 48-bit integer.
+    The string form is only formatted on demand
+    '''
+    __slots__ = ('_int_repr', '_str_repr')
+
     def __init__(self, mac):
         if isinstance(mac, int):
-            self._int_repr = mac
-            self._str_repr = self._int2mac(mac)
+            self._int_repr = self._check(mac)
         elif isinstance(mac, str):
-            self._str_repr = mac.replace('-', ':').replace('.', ':').upper()
-            self._int_repr = self._mac2int(mac)
+            self._int_repr = self._mac2int(mac.replace('-', ':').replace('.', ':'))
         else:
             raise ValueError('MAC address must be string or integer')
+        self._str_repr = None
 
     @property
     def string(self):
+        if self._str_repr is None:
+            self._str_repr = self._int2mac(self._int_repr)
         return self._str_repr
 
     @string.setter
     def string(self, value):
-        self._str_repr = value
         self._int_repr = self._mac2int(value)
+        self._str_repr = None
 
     @property
     def integer(self):
@@ -26,7 +39,30 @@ class NetworkAddress():
     @integer.setter
     def integer(self, value):
         self._int_repr = value
-        self._str_repr = self._int2mac(value)
+        self._str_repr = None
+
+    @property
+    def oui(self):
+        '''Upper 24 bits (vendor part)'''
+        return self._int_repr >> 24
+
+    @property
+    def nic(self):
+        '''Lower 24 bits (device part)'''
+        return self._int_repr & 0xFFFFFF
+
+    @property
+    def octets(self):
+        '''MAC address bytes, most significant first'''
+        return self._int_repr.to_bytes(6, 'big')
+
+    def byte(self, i):
+        '''Get i-th byte of the MAC address (0 — most significant)'''
+        return (self._int_repr >> (40 - 8 * i)) & 0xFF
+
+    def nibble(self, i):
+        '''Get i-th nibble of the MAC address (0 — most significant)'''
+        return (self._int_repr >> (44 - 4 * i)) & 0xF
 
     def __int__(self):
         return self.integer
@@ -52,78 +88,543 @@ class NetworkAddress():
     def __gt__(self, other):
         return self.integer > other.integer
 
+    @staticmethod
+    def _check(mac):
+        if not 0 <= mac < 0x1000000000000:
+            raise ValueError('MAC address must be 48-bit')
+        return mac
+
     def _mac2int(self, mac):
-        return int(mac.replace(':', ''), 16)
+        return self._check(int(mac.replace(':', ''), 16))
 
     def _int2mac(self, mac):
-        mac = hex(mac).split('x')[-1].upper()
-        mac = mac.zfill(12)
+        mac = '{:012X}'.format(mac)
         mac = ':'.join(mac[i:i+2] for i in range(0, 12, 2))
         return mac
 
     def __repr__(self):
         return 'NetworkAddress(string={}, integer={})'.format(
-            self._str_repr, self._int_repr)
+            self.string, self._int_repr)
+
+
+# Bit-reversed value of every byte
+_BITREV_TABLE = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+# Every byte with swapped nibbles
+_NIBSWAP_TABLE = bytes(((i & 0xF) << 4) | (i >> 4) for i in range(256))
+
+
+def _reverse_bytes(value, count, table=None):
+    '''
+    Reverse the order of the lowest `count` bytes of the value.
+    Every byte is additionally translated via the table, if it is given
+    '''
+    b = (value & ((1 << (8 * count)) - 1)).to_bytes(count, 'little')
+    if table is not None:
+        b = b.translate(table)
+    return int.from_bytes(b, 'big')
+
+
+# Known MAC prefixes of the vendors using each algorithm
+SUGGEST_TABLE = {
+    'pin24': ('04BF6D', '0E5D4E', '107BEF', '14A9E3', '28285D', '2A285D', '32B2DC', '381766', '404A03', '4E5D4E', '5067F0', '5CF4AB', '6A285D', '8E5D4E', 'AA285D', 'B0B2DC', 'C86C87', 'CC5D4E', 'CE5D4E', 'EA285D', 'E243F6', 'EC43F6', 'EE43F6', 'F2B2DC', 'FCF528', 'FEF528', '4C9EFF', '0014D1', 'D8EB97', '1C7EE5', '84C9B2', 'FC7516', '14D64D', '9094E4', 'BCF685', 'C4A81D', '00664B', '087A4C', '14B968', '2008ED', '346BD3', '4CEDDE', '786A89', '88E3AB', 'D46E5C', 'E8CD2D', 'EC233D', 'ECCB30', 'F49FF3', '20CF30', '90E6BA', 'E0CB4E', 'D4BF7F4', 'F8C091', '001CDF', '002275', '08863B', '00B00C', '081075', 'C83A35', '0022F7', '001F1F', '00265B', '68B6CF', '788DF7', 'BC1401', '202BC1', '308730', '5C4CA9', '62233D', '623CE4', '623DFF', '6253D4', '62559C', '626BD3', '627D5E', '6296BF', '62A8E4', '62B686', '62C06F', '62C61F', '62C714', '62CBA8', '62CDBE', '62E87B', '6416F0', '6A1D67', '6A233D', '6A3DFF', '6A53D4', '6A559C', '6A6BD3', '6A96BF', '6A7D5E', '6AA8E4', '6AC06F', '6AC61F', '6AC714', '6ACBA8', '6ACDBE', '6AD15E', '6AD167', '721D67', '72233D', '723CE4', '723DFF', '7253D4', '72559C', '726BD3', '727D5E', '7296BF', '72A8E4', '72C06F', '72C61F', '72C714', '72CBA8', '72CDBE', '72D15E', '72E87B', '0026CE', '9897D1', 'E04136', 'B246FC', 'E24136', '00E020', '5CA39D', 'D86CE9', 'DC7144', '801F02', 'E47CF9', '000CF6', '00A026', 'A0F3C1', '647002', 'B0487A', 'F81A67', 'F8D111', '34BA9A', 'B4944E'),
+    'pin28': ('200BC7', '4846FB', 'D46AA8', 'F84ABF'),
+    'pin32': ('000726', 'D8FEE3', 'FC8B97', '1062EB', '1C5F2B', '48EE0C', '802689', '908D78', 'E8CC18', '2CAB25', '10BF48', '14DAE9', '3085A9', '50465D', '5404A6', 'C86000', 'F46D04', '3085A9', '801F02'),
+    'pin24rh': ('D8EB97', '0014D1', '3C8CF8'),
+    'pinDLink': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'A0AB1B', 'B8A386', 'C0A0BB', 'CCB255', 'FC7516', '0014D1', 'D8EB97'),
+    'pinDLink1': ('0018E7', '00195B', '001CF0', '001E58', '002191', '0022B0', '002401', '00265A', '14D64D', '1C7EE5', '340804', '5CD998', '84C9B2', 'B8A386', 'C8BE19', 'C8D3A3', 'CCB255', '0014D1'),
+    'pinASUS': ('049226', '04D9F5', '08606E', '0862669', '107B44', '10BF48', '10C37B', '14DDA9', '1C872C', '1CB72C', '2C56DC', '2CFDA1', '305A3A', '382C4A', '38D547', '40167E', '50465D', '54A050', '6045CB', '60A44C', '704D7B', '74D02B', '7824AF', '88D7F6', '9C5C8E', 'AC220B', 'AC9E17', 'B06EBF', 'BCEE7B', 'C860007', 'D017C2', 'D850E6', 'E03F49', 'F0795978', 'F832E4', '00072624', '0008A1D3', '00177C', '001EA6', '00304FB', '00E04C0', '048D38', '081077', '081078', '081079', '083E5D', '10FEED3C', '181E78', '1C4419', '2420C7', '247F20', '2CAB25', '3085A98C', '3C1E04', '40F201', '44E9DD', '48EE0C', '5464D9', '54B80A', '587BE906', '60D1AA21', '64517E', '64D954', '6C198F', '6C7220', '6CFDB9', '78D99FD', '7C2664', '803F5DF6', '84A423', '88A6C6', '8C10D4', '8C882B00', '904D4A', '907282', '90F65290', '94FBB2', 'A01B29', 'A0F3C1E', 'A8F7E00', 'ACA213', 'B85510', 'B8EE0E', 'BC3400', 'BC9680', 'C891F9', 'D00ED90', 'D084B0', 'D8FEE3', 'E4BEED', 'E894F6F6', 'EC1A5971', 'EC4C4D', 'F42853', 'F43E61', 'F46BEF', 'F8AB05', 'FC8B97', '7062B8', '78542E', 'C0A0BB8C', 'C412F5', 'C4A81D', 'E8CC18', 'EC2280', 'F8E903F4'),
+    'pinAirocon': ('0007262F', '000B2B4A', '000EF4E7', '001333B', '00177C', '001AEF', '00E04BB3', '02101801', '0810734', '08107710', '1013EE0', '2CAB25C7', '788C54', '803F5DF6', '94FBB2', 'BC9680', 'F43E61', 'FC8B97'),
+    'pinEmpty': ('E46F13', 'EC2280', '58D56E', '1062EB', '10BEF5', '1C5F2B', '802689', 'A0AB1B', '74DADA', '9CD643', '68A0F6', '0C96BF', '20F3A3', 'ACE215', 'C8D15E', '000E8F', 'D42122', '3C9872', '788102', '7894B4', 'D460E3', 'E06066', '004A77', '2C957F', '64136C', '74A78E', '88D274', '702E22', '74B57E', '789682', '7C3953', '8C68C8', 'D476EA', '344DEA', '38D82F', '54BE53', '709F2D', '94A7B7', '981333', 'CAA366', 'D0608C'),
+    'pinCisco': ('001A2B', '00248C', '002618', '344DEB', '7071BC', 'E06995', 'E0CB4E', '7054F5'),
+    'pinBrcm1': ('ACF1DF', 'BCF685', 'C8D3A3', '988B5D', '001AA9', '14144B', 'EC6264'),
+    'pinBrcm2': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19'),
+    'pinBrcm3': ('14D64D', '1C7EE5', '28107B', 'B8A386', 'BCF685', 'C8BE19', '7C034C'),
+    'pinBrcm4': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19', 'C8D3A3', 'CCB255', 'FC7516', '204E7F', '4C17EB', '18622C', '7C03D8', 'D86CE9'),
+    'pinBrcm5': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19', 'C8D3A3', 'CCB255', 'FC7516', '204E7F', '4C17EB', '18622C', '7C03D8', 'D86CE9'),
+    'pinBrcm6': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19', 'C8D3A3', 'CCB255', 'FC7516', '204E7F', '4C17EB', '18622C', '7C03D8', 'D86CE9'),
+    'pinAirc1': ('181E78', '40F201', '44E9DD', 'D084B0'),
+    'pinAirc2': ('84A423', '8C10D4', '88A6C6'),
+    'pinDSL2740R': ('00265A', '1CBDB9', '340804', '5CD998', '84C9B2', 'FC7516'),
+    'pinRealtek1': ('0014D1', '000C42', '000EE8'),
+    'pinRealtek2': ('007263', 'E4BEED'),
+    'pinRealtek3': ('08C6B3',),
+    'pinUpvel': ('784476', 'D4BF7F0', 'F8C091'),
+    'pinUR814AC': ('D4BF7F60',),
+    'pinUR825AC': ('D4BF7F5',),
+    'pinOnlime': ('D4BF7F', 'F8C091', '144D67', '784476', '0014D1'),
+    'pinEdimax': ('801F02', '00E04C'),
+    'pinThomson': ('002624', '4432C8', '88F7C7', 'CC03FA'),
+    'pinHG532x': ('00664B', '086361', '087A4C', '0C96BF', '14B968', '2008ED', '2469A5', '346BD3', '786A89', '88E3AB', '9CC172', 'ACE215', 'D07AB5', 'CCA223', 'E8CD2D', 'F80113', 'F83DFF'),
+    'pinH108L': ('4C09B4', '4CAC0A', '84742A4', '9CD24B', 'B075D5', 'C864C7', 'DC028E', 'FCC897'),
+    'pinONO': ('5C353B', 'DC537C')
+}
+
+
+class PrefixIndex():
+    '''
+    Character trie over MAC address prefixes.
+    Built once from {algo_id: (prefix, ...)} table, so one lookup
+    walks at most len(longest prefix) nodes instead of testing every prefix.
+    Prefixes may have odd length (e.g. 'D4BF7F4' — 28-bit prefix)
+    '''
+    def __init__(self, table):
+        self.ids = tuple(table)
+        self.prefixes = {ID: tuple(mask.upper() for mask in masks) for ID, masks in table.items()}
+        # Every node is a dict: children are keyed by hex digit,
+        # matched algo indexes (including the ancestors' ones) are stored under the None key
+        self.root = {None: ()}
+        for index, masks in enumerate(table.values()):
+            for mask in masks:
+                node = self.root
+                for char in mask.upper():
+                    node = node.setdefault(char, {None: ()})
+                node[None] += (index,)
+        self._propagate(self.root, ())
+
+    def _propagate(self, node, inherited):
+        matched = tuple(sorted(set(inherited + node[None])))
+        node[None] = tuple(self.ids[i] for i in matched)
+        for char, child in node.items():
+            if char is not None:
+                self._propagate(child, matched)
+
+    def lookup(self, mac):
+        '''
+        Get algo IDs whose prefixes match the MAC
+        @mac — MAC address as uppercase hex string without separators
+        Returns the list of algo IDs in table order
+        '''
+        node = self.root
+        for char in mac:
+            child = node.get(char)
+            if child is None:
+                break
+            node = child
+        return list(node[None])
+
+
+_suggest_index = None
+
+
+def _get_suggest_index():
+    '''Build the suggestion prefix index once per process'''
+    global _suggest_index
+    if _suggest_index is None:
+        _suggest_index = PrefixIndex(SUGGEST_TABLE)
+    return _suggest_index
+
+
+def _import_numpy():
+    '''NumPy is optional: it is only needed for the vectorized batch API'''
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _array_reverse(np, values, width, shift):
+    '''Reverse the order of `shift`-bit groups in the lowest `width` bits'''
+    mask = (1 << shift) - 1
+    res = np.zeros_like(values)
+    for i in range(width // shift):
+        res = (res << shift) | ((values >> (i * shift)) & mask)
+    return res
+
+
+def _array_dlink(np, nic):
+    pin = nic ^ 0x55AA55
+    pin ^= (pin & 0xF) * 0x111110
+    pin %= 10000000
+    return np.where(pin < 1000000, pin + (pin % 9) * 1000000 + 1000000, pin)
+
+
+def _array_oui_sub_nic(np, macs):
+    oui = macs >> 24
+    nic = macs & 0xFFFFFF
+    return np.where(nic < oui, oui - nic, (oui + 0x1000000 - nic) & 0xFFFFFF)
+
+
+def _array_asus(np, macs):
+    b = [(macs >> (40 - 8 * i)) & 0xFF for i in range(6)]
+    s = b[1] + b[2] + b[3] + b[4] + b[5]
+    pin = np.zeros_like(macs)
+    for i in range(7):
+        pin = pin * 10 + (b[i % 6] + b[5]) % (10 - (i + s) % 7)
+    return pin
+
+
+def _array_airocon(np, macs):
+    b = [(macs >> (40 - 8 * i)) & 0xFF for i in range(6)]
+    return ((b[0] + b[1]) % 10)\
+        + (((b[5] + b[0]) % 10) * 10)\
+        + (((b[4] + b[5]) % 10) * 100)\
+        + (((b[3] + b[4]) % 10) * 1000)\
+        + (((b[2] + b[3]) % 10) * 10000)\
+        + (((b[1] + b[2]) % 10) * 100000)\
+        + (((b[0] + b[1]) % 10) * 1000000)
+
+
+def pin24(mac):
+    return (mac & 0xFFFFFF)
+
+
+def pin28(mac):
+    return (mac & 0xFFFFFFF)
+
+
+def pin32(mac):
+    return (mac % 0x100000000)
+
+
+def pin36(mac):
+    return (mac % 0x1000000000)
+
+
+def pin40(mac):
+    return (mac % 0x10000000000)
+
+
+def pin44(mac):
+    return (mac % 0x100000000000)
+
+
+def pin48(mac):
+    return mac
+
+
+def pin24rh(mac):
+    return _reverse_bytes(mac, 3)
+
+
+def pin32rh(mac):
+    return _reverse_bytes(mac, 4)
+
+
+def pin48rh(mac):
+    return _reverse_bytes(mac, 6)
+
+
+def pin24rn(mac):
+    return _reverse_bytes(mac, 3, _NIBSWAP_TABLE)
+
+
+def pin32rn(mac):
+    return _reverse_bytes(mac, 4, _NIBSWAP_TABLE)
+
+
+def pin48rn(mac):
+    return _reverse_bytes(mac, 6, _NIBSWAP_TABLE)
+
+
+def pin24rb(mac):
+    return _reverse_bytes(mac, 3, _BITREV_TABLE)
+
+
+def pin32rb(mac):
+    return _reverse_bytes(mac, 4, _BITREV_TABLE)
+
+
+def pin48rb(mac):
+    return _reverse_bytes(mac, 6, _BITREV_TABLE)
+
+
+def pinDLink(mac):
+    # Get the NIC part
+    nic = mac & 0xFFFFFF
+    # Calculating pin
+    pin = nic ^ 0x55AA55
+    pin ^= (((pin & 0xF) << 4) +
+            ((pin & 0xF) << 8) +
+            ((pin & 0xF) << 12) +
+            ((pin & 0xF) << 16) +
+            ((pin & 0xF) << 20))
+    pin %= int(10e6)
+    if pin < int(10e5):
+        pin += ((pin % 9) * int(10e5)) + int(10e5)
+    return pin
+
+
+def pinDLink1(mac):
+    return pinDLink(mac + 1)
+
+
+def pinASUS(mac):
+    b = mac.to_bytes(6, 'big')
+    s = b[1] + b[2] + b[3] + b[4] + b[5]
+    pin = 0
+    for i in range(7):
+        pin = pin * 10 + (b[i % 6] + b[5]) % (10 - (i + s) % 7)
+    return pin
+
+
+def pinAirocon(mac):
+    b = mac.to_bytes(6, 'big')
+    pin = ((b[0] + b[1]) % 10)\
+    + (((b[5] + b[0]) % 10) * 10)\
+    + (((b[4] + b[5]) % 10) * 100)\
+    + (((b[3] + b[4]) % 10) * 1000)\
+    + (((b[2] + b[3]) % 10) * 10000)\
+    + (((b[1] + b[2]) % 10) * 100000)\
+    + (((b[0] + b[1]) % 10) * 1000000)
+    return pin
+
+
+def pinInvNIC(mac):
+    nic = mac & 0xFFFFFF
+    pin = ~nic & 0xFFFFFF
+    return pin
+
+
+def pinNIC2(mac):
+    nic = mac & 0xFFFFFF
+    pin = nic * 2
+    return pin
+
+
+def pinNIC3(mac):
+    nic = mac & 0xFFFFFF
+    pin = nic * 3
+    return pin
+
+
+def pinOUIaddNIC(mac):
+    oui = mac >> 24
+    nic = mac & 0xFFFFFF
+    pin = (oui + nic) % int(10e6)
+    return pin
+
+
+def pinOUIsubNIC(mac):
+    oui = mac >> 24
+    nic = mac & 0xFFFFFF
+    pin = oui - nic if nic < oui else (oui + 0x1000000 - nic) & 0xFFFFFF
+    return pin
+
+
+def pinOUIxorNIC(mac):
+    oui = mac >> 24
+    nic = mac & 0xFFFFFF
+    pin = oui ^ nic
+    return pin
+
+
+ALGO_MAC = 0
+ALGO_EMPTY = 1
+ALGO_STATIC = 2
+
+# Algorithm registry: algo ID → {'name', 'mode', 'gen', 'array_gen', 'vectorisable', 'invertible'}.
+# 'gen' is a pure function of the 48-bit MAC integer, 'array_gen' is its
+# whole-array equivalent taking the numpy module and an uint64 array of MACs,
+# 'invertible' means NICs can be found from the pin analytically (see wpspin.reverse),
+# 'step' is the pin increment of linear algorithms for the next MAC within the same OUI (see WPSpin.sweep).
+# The entries are read-only, generators share the registry through its read-only view
+ALGORITHMS = {}
+_ALGORITHMS_VIEW = MappingProxyType(ALGORITHMS)
+
+
+def register(ID, name, mode, gen, array_gen=None, invertible=False, step=None):
+    '''
+    Register WPS pin algorithm
+    @mode — ALGO_MAC, ALGO_EMPTY or ALGO_STATIC
+    @gen — function of the MAC as integer returning the pin before checksum
+    @step — gen(mac + 1) - gen(mac) if it is constant while the NIC doesn't wrap
+    '''
+    ALGORITHMS[ID] = _algorithm(name, mode, gen, array_gen, invertible, step)
+
+
+def _algorithm(name, mode, gen, array_gen=None, invertible=False, step=None):
+    '''Returns the read-only algorithm registry entry'''
+    return MappingProxyType({
+        'name': name,
+        'mode': mode,
+        'gen': gen,
+        'array_gen': array_gen,
+        'vectorisable': array_gen is not None or mode == ALGO_STATIC,
+        'invertible': invertible,
+        'step': step
+    })
+
+
+register('pin24', '24-bit PIN', ALGO_MAC, pin24, lambda np, m: m & 0xFFFFFF, True, 1)
+register('pin28', '28-bit PIN', ALGO_MAC, pin28, lambda np, m: m & 0xFFFFFFF, True, 1)
+register('pin32', '32-bit PIN', ALGO_MAC, pin32, lambda np, m: m & 0xFFFFFFFF, True, 1)
+register('pin36', '36-bit PIN', ALGO_MAC, pin36, lambda np, m: m & 0xFFFFFFFFF, True, 1)
+register('pin40', '40-bit PIN', ALGO_MAC, pin40, lambda np, m: m & 0xFFFFFFFFFF, True, 1)
+register('pin44', '44-bit PIN', ALGO_MAC, pin44, lambda np, m: m & 0xFFFFFFFFFFF, True, 1)
+register('pin48', '48-bit PIN', ALGO_MAC, pin48, lambda np, m: m, True, 1)
+register('pin24rh', 'Reverse byte 24-bit', ALGO_MAC, pin24rh, lambda np, m: _array_reverse(np, m, 24, 8), True)
+register('pin32rh', 'Reverse byte 32-bit', ALGO_MAC, pin32rh, lambda np, m: _array_reverse(np, m, 32, 8), True)
+register('pin48rh', 'Reverse byte 48-bit', ALGO_MAC, pin48rh, lambda np, m: _array_reverse(np, m, 48, 8), True)
+register('pin24rn', 'Reverse nibble 24-bit', ALGO_MAC, pin24rn, lambda np, m: _array_reverse(np, m, 24, 4), True)
+register('pin32rn', 'Reverse nibble 32-bit', ALGO_MAC, pin32rn, lambda np, m: _array_reverse(np, m, 32, 4), True)
+register('pin48rn', 'Reverse nibble 48-bit', ALGO_MAC, pin48rn, lambda np, m: _array_reverse(np, m, 48, 4), True)
+register('pin24rb', 'Reverse bits 24-bit', ALGO_MAC, pin24rb, lambda np, m: _array_reverse(np, m, 24, 1), True)
+register('pin32rb', 'Reverse bits 32-bit', ALGO_MAC, pin32rb, lambda np, m: _array_reverse(np, m, 32, 1), True)
+register('pin48rb', 'Reverse bits 48-bit', ALGO_MAC, pin48rb, lambda np, m: _array_reverse(np, m, 48, 1), True)
+register('pinDLink', 'D-Link PIN', ALGO_MAC, pinDLink, lambda np, m: _array_dlink(np, m & 0xFFFFFF), True)
+register('pinDLink1', 'D-Link PIN +1', ALGO_MAC, pinDLink1, lambda np, m: _array_dlink(np, (m + 1) & 0xFFFFFF), True)
+register('pinASUS', 'ASUS PIN', ALGO_MAC, pinASUS, _array_asus)
+register('pinAirocon', 'Airocon Realtek', ALGO_MAC, pinAirocon, _array_airocon)
+register('pinInvNIC', 'Inv NIC to PIN', ALGO_MAC, pinInvNIC, lambda np, m: ~m & 0xFFFFFF, True, -1)
+register('pinNIC2', 'NIC * 2', ALGO_MAC, pinNIC2, lambda np, m: (m & 0xFFFFFF) * 2, True, 2)
+register('pinNIC3', 'NIC * 3', ALGO_MAC, pinNIC3, lambda np, m: (m & 0xFFFFFF) * 3, True, 3)
+register('pinOUIaddNIC', 'OUI + NIC', ALGO_MAC, pinOUIaddNIC, lambda np, m: (m >> 24) + (m & 0xFFFFFF), True, 1)
+register('pinOUIsubNIC', 'OUI − NIC', ALGO_MAC, pinOUIsubNIC, _array_oui_sub_nic, True)
+register('pinOUIxorNIC', 'OUI ^ NIC', ALGO_MAC, pinOUIxorNIC, lambda np, m: (m >> 24) ^ (m & 0xFFFFFF), True)
+# Static pin algos
+register('pinEmpty', 'Empty PIN', ALGO_EMPTY, lambda mac: '')
+register('pinCisco', 'Cisco', ALGO_STATIC, lambda mac: 1234567)
+register('pinBrcm1', 'Broadcom 1', ALGO_STATIC, lambda mac: 2017252)
+register('pinBrcm2', 'Broadcom 2', ALGO_STATIC, lambda mac: 4626484)
+register('pinBrcm3', 'Broadcom 3', ALGO_STATIC, lambda mac: 7622990)
+register('pinBrcm4', 'Broadcom 4', ALGO_STATIC, lambda mac: 6232714)
+register('pinBrcm5', 'Broadcom 5', ALGO_STATIC, lambda mac: 1086411)
+register('pinBrcm6', 'Broadcom 6', ALGO_STATIC, lambda mac: 3195719)
+register('pinAirc1', 'Airocon 1', ALGO_STATIC, lambda mac: 3043203)
+register('pinAirc2', 'Airocon 2', ALGO_STATIC, lambda mac: 7141225)
+register('pinDSL2740R', 'DSL-2740R', ALGO_STATIC, lambda mac: 6817554)
+register('pinRealtek1', 'Realtek 1', ALGO_STATIC, lambda mac: 9566146)
+register('pinRealtek2', 'Realtek 2', ALGO_STATIC, lambda mac: 9571911)
+register('pinRealtek3', 'Realtek 3', ALGO_STATIC, lambda mac: 4856371)
+register('pinUpvel', 'Upvel', ALGO_STATIC, lambda mac: 2085483)
+register('pinUR814AC', 'UR-814AC', ALGO_STATIC, lambda mac: 4397768)
+register('pinUR825AC', 'UR-825AC', ALGO_STATIC, lambda mac: 529417)
+register('pinOnlime', 'Onlime', ALGO_STATIC, lambda mac: 9995604)
+register('pinEdimax', 'Edimax', ALGO_STATIC, lambda mac: 3561153)
+register('pinThomson', 'Thomson', ALGO_STATIC, lambda mac: 6795814)
+register('pinHG532x', 'HG532x', ALGO_STATIC, lambda mac: 3425928)
+register('pinH108L', 'H108L', ALGO_STATIC, lambda mac: 9422988)
+register('pinONO', 'CBN ONO', ALGO_STATIC, lambda mac: 9575521)
+
+
+def _mac_integer(mac):
+    '''Parse MAC address given as integer, string or NetworkAddress'''
+    if isinstance(mac, int):
+        return NetworkAddress._check(mac)
+    if isinstance(mac, NetworkAddress):
+        return mac.integer
+    return NetworkAddress(mac).integer
+
+
+_checksum_table = None
+
+
+def _get_checksum_table():
+    '''
+    Partial WPS checksum sums (mod 10) of every 4 digit chunk.
+    The weights of a chunk digits are 3, 1, 3, 1 from the lowest one,
+    so a pin of any length is the sum of its 4 digit chunks
+    '''
+    global _checksum_table
+    if _checksum_table is None:
+        _checksum_table = bytes(
+            (3 * (i % 10) + (i // 10) % 10 + 3 * ((i // 100) % 10) + i // 1000) % 10
+            for i in range(10000))
+    return _checksum_table
+
+
+_digits_table = None
+
+
+def _get_digits_table():
+    '''ASCII digits of every 4 digit number, zero-padded'''
+    global _digits_table
+    if _digits_table is None:
+        _digits_table = memoryview(''.join('{:04d}'.format(i) for i in range(10000)).encode('ascii'))
+    return _digits_table
+
+
+def _array_checksum(np, pins):
+    '''WPS checksum of every 7 digit pin in the array'''
+    table = np.frombuffer(_get_checksum_table(), dtype=np.uint8)
+    accum = table[pins % 10000] + table[pins // 10000]
+    return (10 - accum % 10) % 10
 
 
 class WPSpin():
-    '''WPS pin generator'''
-    def __init__(self):
-        self.ALGO_MAC = 0
-        self.ALGO_EMPTY = 1
-        self.ALGO_STATIC = 2
-
-        self.algos = {}
-        self.algos['pin24'] = {'name': '24-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin24}
-        self.algos['pin28'] = {'name': '28-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin28}
-        self.algos['pin32'] = {'name': '32-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin32}
-        self.algos['pin36'] = {'name': '36-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin36}
-        self.algos['pin40'] = {'name': '40-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin40}
-        self.algos['pin44'] = {'name': '44-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin44}
-        self.algos['pin48'] = {'name': '48-bit PIN', 'mode': self.ALGO_MAC, 'gen': self.pin48}
-        self.algos['pin24rh'] = {'name': 'Reverse byte 24-bit', 'mode': self.ALGO_MAC, 'gen': self.pin24rh}
-        self.algos['pin32rh'] = {'name': 'Reverse byte 32-bit', 'mode': self.ALGO_MAC, 'gen': self.pin32rh}
-        self.algos['pin48rh'] = {'name': 'Reverse byte 48-bit', 'mode': self.ALGO_MAC, 'gen': self.pin48rh}
-        self.algos['pin24rn'] = {'name': 'Reverse nibble 24-bit', 'mode': self.ALGO_MAC, 'gen': self.pin24rn}
-        self.algos['pin32rn'] = {'name': 'Reverse nibble 32-bit', 'mode': self.ALGO_MAC, 'gen': self.pin32rn}
-        self.algos['pin48rn'] = {'name': 'Reverse nibble 48-bit', 'mode': self.ALGO_MAC, 'gen': self.pin48rn}
-        self.algos['pin24rb'] = {'name': 'Reverse bits 24-bit', 'mode': self.ALGO_MAC, 'gen': self.pin24rb}
-        self.algos['pin32rb'] = {'name': 'Reverse bits 32-bit', 'mode': self.ALGO_MAC, 'gen': self.pin32rb}
-        self.algos['pin48rb'] = {'name': 'Reverse bits 48-bit', 'mode': self.ALGO_MAC, 'gen': self.pin48rb}
-        self.algos['pinDLink'] = {'name': 'D-Link PIN', 'mode': self.ALGO_MAC, 'gen': self.pinDLink}
-        self.algos['pinDLink1'] = {'name': 'D-Link PIN +1', 'mode': self.ALGO_MAC, 'gen': self.pinDLink1}
-        self.algos['pinASUS'] = {'name': 'ASUS PIN', 'mode': self.ALGO_MAC, 'gen': self.pinASUS}
-        self.algos['pinAirocon'] = {'name': 'Airocon Realtek', 'mode': self.ALGO_MAC, 'gen': self.pinAirocon}
-        self.algos['pinInvNIC'] = {'name': 'Inv NIC to PIN', 'mode': self.ALGO_MAC, 'gen': self.pinInvNIC}
-        self.algos['pinNIC2'] = {'name': 'NIC * 2', 'mode': self.ALGO_MAC, 'gen': self.pinNIC2}
-        self.algos['pinNIC3'] = {'name': 'NIC * 3', 'mode': self.ALGO_MAC, 'gen': self.pinNIC3}
-        self.algos['pinOUIaddNIC'] = {'name': 'OUI + NIC', 'mode': self.ALGO_MAC, 'gen': self.pinOUIaddNIC}
-        self.algos['pinOUIsubNIC'] = {'name': 'OUI − NIC', 'mode': self.ALGO_MAC, 'gen': self.pinOUIsubNIC}
-        self.algos['pinOUIxorNIC'] = {'name': 'OUI ^ NIC', 'mode': self.ALGO_MAC, 'gen': self.pinOUIxorNIC}
-        # Static pin algos
-        self.algos['pinEmpty'] = {'name': 'Empty PIN', 'mode': self.ALGO_EMPTY, 'gen': lambda mac: ''}
-        self.algos['pinCisco'] = {'name': 'Cisco', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 1234567}
-        self.algos['pinBrcm1'] = {'name': 'Broadcom 1', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 2017252}
-        self.algos['pinBrcm2'] = {'name': 'Broadcom 2', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 4626484}
-        self.algos['pinBrcm3'] = {'name': 'Broadcom 3', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 7622990}
-        self.algos['pinBrcm4'] = {'name': 'Broadcom 4', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 6232714}
-        self.algos['pinBrcm5'] = {'name': 'Broadcom 5', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 1086411}
-        self.algos['pinBrcm6'] = {'name': 'Broadcom 6', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 3195719}
-        self.algos['pinAirc1'] = {'name': 'Airocon 1', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 3043203}
-        self.algos['pinAirc2'] = {'name': 'Airocon 2', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 7141225}
-        self.algos['pinDSL2740R'] = {'name': 'DSL-2740R', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 6817554}
-        self.algos['pinRealtek1'] = {'name': 'Realtek 1', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 9566146}
-        self.algos['pinRealtek2'] = {'name': 'Realtek 2', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 9571911}
-        self.algos['pinRealtek3'] = {'name': 'Realtek 3', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 4856371}
-        self.algos['pinUpvel'] = {'name': 'Upvel', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 2085483}
-        self.algos['pinUR814AC'] = {'name': 'UR-814AC', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 4397768}
-        self.algos['pinUR825AC'] = {'name': 'UR-825AC', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 529417}
-        self.algos['pinOnlime'] = {'name': 'Onlime', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 9995604}
-        self.algos['pinEdimax'] = {'name': 'Edimax', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 3561153}
-        self.algos['pinThomson'] = {'name': 'Thomson', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 6795814}
-        self.algos['pinHG532x'] = {'name': 'HG532x', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 3425928}
-        self.algos['pinH108L'] = {'name': 'H108L', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 9422988}
-        self.algos['pinONO'] = {'name': 'CBN ONO', 'mode': self.ALGO_STATIC, 'gen': lambda mac: 9575521}
+    '''
+    WPS pin generator
+    @pindb — optional precomputed pin database (PinDatabase or path to it)
+    to serve the covered MACs from
+    @stats — optional pin success statistics (PinStats or path to it) for getRanked
+    @cache_size — number of results to keep in the LRU cache, 0 disables it.
+    Cached results are shared and immutable: tuples of read-only dicts
+    @profile — count calls and time of the generation stages and algorithms,
+    see self.profiler. Disabled profiling costs nothing
+    @data — optional external algorithm and OUI database
+    (DataFile or path to it), see reload_data()
+    '''
+    ALGO_MAC = ALGO_MAC
+    ALGO_EMPTY = ALGO_EMPTY
+    ALGO_STATIC = ALGO_STATIC
+
+    def __init__(self, pindb=None, stats=None, cache_size=0, profile=False, data=None):
+        if isinstance(pindb, str):
+            from .pindb import PinDatabase
+            pindb = PinDatabase(pindb)
+        self.pindb = pindb
+        self._stats = stats
+        self.cache_size = cache_size
+        self._cache = None
+        if cache_size:
+            import threading
+            from collections import OrderedDict
+            self._cache = OrderedDict()
+            self._cache_lock = threading.Lock()
+        self._cache_hits = self._cache_misses = self._cache_evictions = 0
+
+        # (algos, suggestion prefix index or None for the module-level one, generation).
+        # Replaced as a whole, every call reads it once, so a reload never mixes
+        # the old and new tables; the generation is a part of the cache keys
+        self._tables = (_ALGORITHMS_VIEW, None, 0)
+        if isinstance(data, str):
+            from .datafile import DataFile
+            data = DataFile(data)
+        self.data = data
+        self._data_tables = None
+        if data is not None:
+            self._data_tables = data.tables
+            self._tables = data.tables + (0,)
+
+        self.profiler = None
+        if profile:
+            self._enable_profiling()
+
+    # MAC parser, replaced by the profiled one if profiling is enabled
+    _parse = staticmethod(_mac_integer)
+
+    def _enable_profiling(self):
+        '''Shadow the hot path methods with the instrumented ones'''
+        from .profiling import Profiler
+        self.profiler = profiler = Profiler()
+        self._parse = profiler.wrap('parse', _mac_integer)
+        self._suggest = profiler.wrap('suggest', self._suggest)
+        self._generate = self._generate_profiled
+        self._generate_many = profiler.wrap('generate_many', self._generate_many)
+
+    @property
+    def algos(self):
+        '''
+        Read-only algorithm registry used by this generator, see register().
+        Assign a dict of algo ID → entry to use other algos in this generator only
+        '''
+        return self._tables[0]
+
+    @algos.setter
+    def algos(self, algos):
+        index, generation = self._tables[1:]
+        algos = MappingProxyType({ID: MappingProxyType(dict(algo)) for ID, algo in algos.items()})
+        self._tables = (algos, index, generation + 1)
+
+    @property
+    def stats(self):
+        '''Pin success statistics, loaded on first use'''
+        stats = self._stats
+        if stats is None or isinstance(stats, str):
+            from .ranking import PinStats
+            stats = self._stats = PinStats(stats)
+        return stats
 
     def checksum(self, pin):
         '''
@@ -131,12 +632,11 @@ class WPSpin():
         @pin — A 7 digit pin to calculate the checksum for.
         Returns the checksum value.
         '''
+        table = _get_checksum_table()
         accum = 0
         while pin:
-            accum += (3 * (pin % 10))
-            pin = int(pin / 10)
-            accum += (pin % 10)
-            pin = int(pin / 10)
+            accum += table[pin % 10000]
+            pin //= 10000
         return ((10 - accum % 10) % 10)
 
     def generate(self, algo, mac):
@@ -145,22 +645,91 @@ class WPSpin():
         @algo — the WPS pin algorithm ID
         Returns the WPS pin string value
         '''
-        mac = NetworkAddress(mac)
-        if algo not in self.algos:
+        mac = self._parse(mac)
+        algos = self._tables[0]
+        if algo not in algos:
             raise ValueError('Invalid WPS pin algorithm')
-        pin = self.algos[algo]['gen'](mac)
-        if algo == 'pinEmpty':
+        return self._generate(algo, algos[algo], mac)
+
+    def _generate(self, ID, algo, mac):
+        return self._format_pin(algo, self._raw_pin(ID, algo, mac))
+
+    def _raw_pin(self, ID, algo, mac):
+        '''Returns the pin before checksum, from the pin database if it covers the MAC'''
+        if self.pindb is not None:
+            pin = self.pindb.lookup(ID, mac)
+            if pin is not None:
+                return pin // 10
+        return algo['gen'](mac)
+
+    def _format_pin(self, algo, pin):
+        '''Returns the 8 digit pin string with checksum, the empty pin as is'''
+        if algo['mode'] == ALGO_EMPTY:
             return pin
         pin = pin % 10000000
-        pin = str(pin) + str(self.checksum(pin))
-        return pin.zfill(8)
+        return '{:08d}'.format(pin * 10 + self.checksum(pin))
+
+    def _generate_profiled(self, ID, algo, mac):
+        '''_generate with the algo and format time accounted to the profiler'''
+        clock = time.perf_counter_ns
+        start = clock()
+        pin = self._raw_pin(ID, algo, mac)
+        middle = clock()
+        res = self._format_pin(algo, pin)
+        end = clock()
+        self.profiler.add(self.profiler.algos, ID, middle - start)
+        self.profiler.add(self.profiler.stages, 'format', end - middle)
+        return res
+
+    def format_pins(self, pins, buffer=None, offset=0):
+        '''
+        Bulk pin formatter: writes 8 digit pins, each followed by newline,
+        straight into the buffer without creating per-pin strings
+        @pins — iterable of integer pins with checksum (see generate_many)
+        @buffer — preallocated writable buffer (bytearray, memoryview, mmap),
+        at least 9 bytes per pin. Allocated if not given
+        @offset — position in the buffer to start writing from
+        Returns the buffer
+        '''
+        np = _import_numpy()
+        if np is not None and isinstance(pins, np.ndarray):
+            pins = pins.astype(np.uint32, copy=False)
+            if buffer is None:
+                buffer = bytearray(offset + 9 * len(pins))
+            chars = np.frombuffer(buffer, dtype=np.uint8, count=9 * len(pins), offset=offset)
+            chars = chars.reshape(len(pins), 9)
+            for i in range(8):
+                chars[:, 7 - i] = pins // (10 ** i) % 10 + 0x30
+            chars[:, 8] = 0x0A
+            return buffer
+        digits = _get_digits_table()
+        if buffer is None:
+            pins = list(pins)
+            buffer = bytearray(offset + 9 * len(pins))
+        view = memoryview(buffer)
+        for pin in pins:
+            hi = 4 * (pin // 10000)
+            lo = 4 * (pin % 10000)
+            view[offset:offset + 4] = digits[hi:hi + 4]
+            view[offset + 4:offset + 8] = digits[lo:lo + 4]
+            view[offset + 8] = 0x0A
+            offset += 9
+        return buffer
 
     def getAll(self, mac, get_static=True):
         '''
         Get all WPS pin's for single MAC
         '''
+        return self._getAll(self._parse(mac), get_static, self._tables)
+
+    def _getAll(self, mac, get_static, tables):
+        algos, _, generation = tables
+        key = self._cache_key('getAll', mac, generation, get_static)
+        res = self._cache_get(key)
+        if res is not None:
+            return res
         res = []
-        for ID, algo in self.algos.items():
+        for ID, algo in algos.items():
             if algo['mode'] == self.ALGO_STATIC and not get_static:
                 continue
             item = {}
@@ -169,220 +738,487 @@ class WPSpin():
                 item['name'] = 'Static PIN — ' + algo['name']
             else:
                 item['name'] = algo['name']
-            item['pin'] = self.generate(ID, mac)
+            item['pin'] = self._generate(ID, algo, mac)
             res.append(item)
-        return res
+        return self._cache_put(key, res)
 
     def getList(self, mac, get_static=True):
         '''
         Get all WPS pin's for single MAC as list
         '''
+        mac = self._parse(mac)
+        algos, _, generation = self._tables
+        key = self._cache_key('getList', mac, generation, get_static)
+        res = self._cache_get(key)
+        if res is not None:
+            return res
         res = []
-        for ID, algo in self.algos.items():
+        for ID, algo in algos.items():
             if algo['mode'] == self.ALGO_STATIC and not get_static:
                 continue
-            res.append(self.generate(ID, mac))
-        return res
+            res.append(self._generate(ID, algo, mac))
+        return self._cache_put(key, res)
 
     def getSuggested(self, mac):
         '''
         Get all suggested WPS pin's for single MAC
         '''
-        algos = self._suggest(mac)
+        tables = self._tables
+        algos, _, generation = tables
+        mac_int = self._parse(mac)
+        key = self._cache_key('getSuggested', mac_int, generation)
+        res = self._cache_get(key)
+        if res is not None:
+            return res
+        # Suggestions are only looked up on a cache miss
+        mac = mac_int
+        suggested = self._suggest(mac, tables)
         res = []
-        for ID in algos:
-            algo = self.algos[ID]
+        for ID in suggested:
+            algo = algos[ID]
             item = {}
             item['id'] = ID
             if algo['mode'] == self.ALGO_STATIC:
                 item['name'] = 'Static PIN — ' + algo['name']
             else:
                 item['name'] = algo['name']
-            item['pin'] = self.generate(ID, mac)
+            item['pin'] = self._generate(ID, algo, mac)
             res.append(item)
-        return res
+        return self._cache_put(key, res)
 
     def getSuggestedList(self, mac):
         '''
         Get all suggested WPS pin's for single MAC as list
         '''
-        algos = self._suggest(mac)
+        tables = self._tables
+        algos, _, generation = tables
+        mac_int = self._parse(mac)
+        key = self._cache_key('getSuggestedList', mac_int, generation)
+        res = self._cache_get(key)
+        if res is not None:
+            return res
+        # Suggestions are only looked up on a cache miss
+        mac = mac_int
+        suggested = self._suggest(mac, tables)
         res = []
-        for algo in algos:
-            res.append(self.generate(algo, mac))
+        for ID in suggested:
+            res.append(self._generate(ID, algos[ID], mac))
+        return self._cache_put(key, res)
+
+    def _cache_key(self, method, mac, generation, *args):
+        if self._cache is None:
+            return None
+        # Results computed with the replaced tables never match the current generation
+        return (method, mac, generation) + args
+
+    def _cache_get(self, key):
+        if key is None:
+            return None
+        with self._cache_lock:
+            res = self._cache.get(key)
+            if res is None:
+                self._cache_misses += 1
+            else:
+                self._cache_hits += 1
+                self._cache.move_to_end(key)
+            return res
+
+    def _cache_put(self, key, res):
+        if key is None:
+            return res
+        res = tuple(MappingProxyType(item) if isinstance(item, dict) else item for item in res)
+        with self._cache_lock:
+            self._cache[key] = res
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._cache_evictions += 1
         return res
 
-    def _suggest(self, mac):
+    def cache_info(self):
         '''
-        Get algos suggestions for single MAC
-        Returns the algo ID
+        Get the result cache counters
+        Returns the dict with hits, misses, evictions, size and maxsize
         '''
-        mac = mac.replace(':', '').upper()
-        algorithms = {
-            'pin24': ('04BF6D', '0E5D4E', '107BEF', '14A9E3', '28285D', '2A285D', '32B2DC', '381766', '404A03', '4E5D4E', '5067F0', '5CF4AB', '6A285D', '8E5D4E', 'AA285D', 'B0B2DC', 'C86C87', 'CC5D4E', 'CE5D4E', 'EA285D', 'E243F6', 'EC43F6', 'EE43F6', 'F2B2DC', 'FCF528', 'FEF528', '4C9EFF', '0014D1', 'D8EB97', '1C7EE5', '84C9B2', 'FC7516', '14D64D', '9094E4', 'BCF685', 'C4A81D', '00664B', '087A4C', '14B968', '2008ED', '346BD3', '4CEDDE', '786A89', '88E3AB', 'D46E5C', 'E8CD2D', 'EC233D', 'ECCB30', 'F49FF3', '20CF30', '90E6BA', 'E0CB4E', 'D4BF7F4', 'F8C091', '001CDF', '002275', '08863B', '00B00C', '081075', 'C83A35', '0022F7', '001F1F', '00265B', '68B6CF', '788DF7', 'BC1401', '202BC1', '308730', '5C4CA9', '62233D', '623CE4', '623DFF', '6253D4', '62559C', '626BD3', '627D5E', '6296BF', '62A8E4', '62B686', '62C06F', '62C61F', '62C714', '62CBA8', '62CDBE', '62E87B', '6416F0', '6A1D67', '6A233D', '6A3DFF', '6A53D4', '6A559C', '6A6BD3', '6A96BF', '6A7D5E', '6AA8E4', '6AC06F', '6AC61F', '6AC714', '6ACBA8', '6ACDBE', '6AD15E', '6AD167', '721D67', '72233D', '723CE4', '723DFF', '7253D4', '72559C', '726BD3', '727D5E', '7296BF', '72A8E4', '72C06F', '72C61F', '72C714', '72CBA8', '72CDBE', '72D15E', '72E87B', '0026CE', '9897D1', 'E04136', 'B246FC', 'E24136', '00E020', '5CA39D', 'D86CE9', 'DC7144', '801F02', 'E47CF9', '000CF6', '00A026', 'A0F3C1', '647002', 'B0487A', 'F81A67', 'F8D111', '34BA9A', 'B4944E'),
-            'pin28': ('200BC7', '4846FB', 'D46AA8', 'F84ABF'),
-            'pin32': ('000726', 'D8FEE3', 'FC8B97', '1062EB', '1C5F2B', '48EE0C', '802689', '908D78', 'E8CC18', '2CAB25', '10BF48', '14DAE9', '3085A9', '50465D', '5404A6', 'C86000', 'F46D04', '3085A9', '801F02'),
-            'pin24rh': ('D8EB97', '0014D1', '3C8CF8'),
-            'pinDLink': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'A0AB1B', 'B8A386', 'C0A0BB', 'CCB255', 'FC7516', '0014D1', 'D8EB97'),
-            'pinDLink1': ('0018E7', '00195B', '001CF0', '001E58', '002191', '0022B0', '002401', '00265A', '14D64D', '1C7EE5', '340804', '5CD998', '84C9B2', 'B8A386', 'C8BE19', 'C8D3A3', 'CCB255', '0014D1'),
-            'pinASUS': ('049226', '04D9F5', '08606E', '0862669', '107B44', '10BF48', '10C37B', '14DDA9', '1C872C', '1CB72C', '2C56DC', '2CFDA1', '305A3A', '382C4A', '38D547', '40167E', '50465D', '54A050', '6045CB', '60A44C', '704D7B', '74D02B', '7824AF', '88D7F6', '9C5C8E', 'AC220B', 'AC9E17', 'B06EBF', 'BCEE7B', 'C860007', 'D017C2', 'D850E6', 'E03F49', 'F0795978', 'F832E4', '00072624', '0008A1D3', '00177C', '001EA6', '00304FB', '00E04C0', '048D38', '081077', '081078', '081079', '083E5D', '10FEED3C', '181E78', '1C4419', '2420C7', '247F20', '2CAB25', '3085A98C', '3C1E04', '40F201', '44E9DD', '48EE0C', '5464D9', '54B80A', '587BE906', '60D1AA21', '64517E', '64D954', '6C198F', '6C7220', '6CFDB9', '78D99FD', '7C2664', '803F5DF6', '84A423', '88A6C6', '8C10D4', '8C882B00', '904D4A', '907282', '90F65290', '94FBB2', 'A01B29', 'A0F3C1E', 'A8F7E00', 'ACA213', 'B85510', 'B8EE0E', 'BC3400', 'BC9680', 'C891F9', 'D00ED90', 'D084B0', 'D8FEE3', 'E4BEED', 'E894F6F6', 'EC1A5971', 'EC4C4D', 'F42853', 'F43E61', 'F46BEF', 'F8AB05', 'FC8B97', '7062B8', '78542E', 'C0A0BB8C', 'C412F5', 'C4A81D', 'E8CC18', 'EC2280', 'F8E903F4'),
-            'pinAirocon': ('0007262F', '000B2B4A', '000EF4E7', '001333B', '00177C', '001AEF', '00E04BB3', '02101801', '0810734', '08107710', '1013EE0', '2CAB25C7', '788C54', '803F5DF6', '94FBB2', 'BC9680', 'F43E61', 'FC8B97'),
-            'pinEmpty': ('E46F13', 'EC2280', '58D56E', '1062EB', '10BEF5', '1C5F2B', '802689', 'A0AB1B', '74DADA', '9CD643', '68A0F6', '0C96BF', '20F3A3', 'ACE215', 'C8D15E', '000E8F', 'D42122', '3C9872', '788102', '7894B4', 'D460E3', 'E06066', '004A77', '2C957F', '64136C', '74A78E', '88D274', '702E22', '74B57E', '789682', '7C3953', '8C68C8', 'D476EA', '344DEA', '38D82F', '54BE53', '709F2D', '94A7B7', '981333', 'CAA366', 'D0608C'),
-            'pinCisco': ('001A2B', '00248C', '002618', '344DEB', '7071BC', 'E06995', 'E0CB4E', '7054F5'),
-            'pinBrcm1': ('ACF1DF', 'BCF685', 'C8D3A3', '988B5D', '001AA9', '14144B', 'EC6264'),
-            'pinBrcm2': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19'),
-            'pinBrcm3': ('14D64D', '1C7EE5', '28107B', 'B8A386', 'BCF685', 'C8BE19', '7C034C'),
-            'pinBrcm4': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19', 'C8D3A3', 'CCB255', 'FC7516', '204E7F', '4C17EB', '18622C', '7C03D8', 'D86CE9'),
-            'pinBrcm5': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19', 'C8D3A3', 'CCB255', 'FC7516', '204E7F', '4C17EB', '18622C', '7C03D8', 'D86CE9'),
-            'pinBrcm6': ('14D64D', '1C7EE5', '28107B', '84C9B2', 'B8A386', 'BCF685', 'C8BE19', 'C8D3A3', 'CCB255', 'FC7516', '204E7F', '4C17EB', '18622C', '7C03D8', 'D86CE9'),
-            'pinAirc1': ('181E78', '40F201', '44E9DD', 'D084B0'),
-            'pinAirc2': ('84A423', '8C10D4', '88A6C6'),
-            'pinDSL2740R': ('00265A', '1CBDB9', '340804', '5CD998', '84C9B2', 'FC7516'),
-            'pinRealtek1': ('0014D1', '000C42', '000EE8'),
-            'pinRealtek2': ('007263', 'E4BEED'),
-            'pinRealtek3': ('08C6B3',),
-            'pinUpvel': ('784476', 'D4BF7F0', 'F8C091'),
-            'pinUR814AC': ('D4BF7F60',),
-            'pinUR825AC': ('D4BF7F5',),
-            'pinOnlime': ('D4BF7F', 'F8C091', '144D67', '784476', '0014D1'),
-            'pinEdimax': ('801F02', '00E04C'),
-            'pinThomson': ('002624', '4432C8', '88F7C7', 'CC03FA'),
-            'pinHG532x': ('00664B', '086361', '087A4C', '0C96BF', '14B968', '2008ED', '2469A5', '346BD3', '786A89', '88E3AB', '9CC172', 'ACE215', 'D07AB5', 'CCA223', 'E8CD2D', 'F80113', 'F83DFF'),
-            'pinH108L': ('4C09B4', '4CAC0A', '84742A4', '9CD24B', 'B075D5', 'C864C7', 'DC028E', 'FCC897'),
-            'pinONO': ('5C353B', 'DC537C')
+        return {
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'evictions': self._cache_evictions,
+            'size': len(self._cache) if self._cache is not None else 0,
+            'maxsize': self.cache_size
         }
+
+    def invalidate_cache(self):
+        '''
+        Drop all cached results.
+        Must be called after changing the algorithms or suggestions
+        '''
+        algos, index, generation = self._tables
+        self._tables = (algos, index, generation + 1)
+        if self._cache is not None:
+            with self._cache_lock:
+                self._cache.clear()
+
+    def reload_data(self, force=False):
+        '''
+        Reload the external data file if it has changed since the last load.
+        The new tables are compiled aside and swapped in, so the lookups
+        in progress finish with the old ones
+        Returns True if the tables have changed
+        '''
+        if self.data is None:
+            return False
+        self.data.reload(force)
+        tables = self.data.tables
+        if tables is self._data_tables:
+            return False
+        self._data_tables = tables
+        self._tables = tables + (self._tables[2] + 1,)
+        self.invalidate_cache()
+        return True
+
+    def getRanked(self, mac, limit=None, get_static=True):
+        '''
+        Get distinct WPS pin's for single MAC, most probable first.
+        Probabilities are estimated from the suggestions and self.stats;
+        the pin produced by several algos is tried once
+        @limit — maximum number of pins to return
+        Returns the list of {'pin', 'ids', 'names', 'score'} dicts
+        '''
+        return self._getRanked(self._parse(mac), limit, get_static, self._tables)
+
+    def _getRanked(self, mac, limit, get_static, tables):
+        suggested = set(self._suggest(mac, tables))
+        pins = {}
+        for item in self._getAll(mac, get_static, tables):
+            p = self.stats.probability(mac, item['id'], item['id'] in suggested)
+            if item['pin'] not in pins:
+                pins[item['pin']] = {'pin': item['pin'], 'ids': [], 'names': [], 'miss': 1.0}
+            ranked = pins[item['pin']]
+            ranked['ids'].append(item['id'])
+            ranked['names'].append(item['name'])
+            ranked['miss'] *= 1 - p
         res = []
-        for algo_id, masks in algorithms.items():
-            if mac.startswith(masks):
-                res.append(algo_id)
+        for ranked in pins.values():
+            ranked['score'] = 1 - ranked.pop('miss')
+            res.append(ranked)
+        res.sort(key=lambda ranked: ranked['score'], reverse=True)
+        return res[:limit]
+
+    def getPlan(self, mac, get_all=False):
+        '''
+        Get the attempt plan of distinct WPS pin's for single MAC,
+        grouped by the first half of the pin (see wpspin.planner)
+        @get_all — plan all pins instead of the suggested ones
+        Returns the dict with the groups and expected number of exchanges
+        '''
+        from .planner import plan_attempts
+        mac = self._parse(mac)
+        tables = self._tables
+        ranked = self._getRanked(mac, None, True, tables)
+        if not get_all:
+            suggested = set(self._suggest(mac, tables))
+            ranked = [item for item in ranked if suggested.intersection(item['ids'])]
+        return plan_attempts(ranked)
+
+    def generate_many(self, algo, macs):
+        '''
+        Batch WPS pin generator
+        @algo — the WPS pin algorithm ID
+        @macs — sequence of MAC addresses (integers or strings) or NumPy uint64 array
+        Returns the array of 8 digit pins as integers: NumPy uint32 array
+        if NumPy is available, otherwise array.array
+        '''
+        algos = self._tables[0]
+        if algo not in algos:
+            raise ValueError('Invalid WPS pin algorithm')
+        if algos[algo]['mode'] == self.ALGO_EMPTY:
+            raise ValueError('Empty PIN can not be represented as integer')
+        return self._generate_many(algos[algo], macs)
+
+    def _generate_many(self, algo, macs):
+        np = _import_numpy()
+        if np is None:
+            return self._generate_many_fallback(algo, macs)
+        if not isinstance(macs, np.ndarray):
+            macs = [_mac_integer(mac) for mac in macs]
+        macs = np.asarray(macs, dtype=np.uint64)
+        if algo['mode'] == ALGO_STATIC:
+            pins = np.full(macs.shape, algo['gen'](0), dtype=np.uint64)
+        elif algo.get('array_gen') is not None:
+            pins = algo['array_gen'](np, macs)
+        else:
+            pins = np.fromiter((algo['gen'](int(mac)) for mac in macs), dtype=np.uint64, count=len(macs))
+        pins = pins % 10000000
+        return (pins * 10 + _array_checksum(np, pins)).astype(np.uint32)
+
+    def _generate_many_fallback(self, algo, macs):
+        from array import array
+        gen = algo['gen']
+        res = array('L')
+        for mac in macs:
+            pin = gen(_mac_integer(mac)) % 10000000
+            res.append(pin * 10 + self.checksum(pin))
         return res
 
-    def pin24(self, mac):
-        return (mac.integer & 0xFFFFFF)
+    def getAll_many(self, macs, get_static=True):
+        '''
+        Get all WPS pin's for many MACs
+        Returns the dict: algo ID → array of 8 digit pins (see generate_many).
+        Empty PIN is omitted
+        '''
+        np = _import_numpy()
+        if np is not None and not isinstance(macs, np.ndarray):
+            macs = np.asarray([_mac_integer(mac) for mac in macs], dtype=np.uint64)
+        elif np is None:
+            macs = [_mac_integer(mac) for mac in macs]
+        res = {}
+        for ID, algo in self._tables[0].items():
+            if algo['mode'] == self.ALGO_EMPTY:
+                continue
+            if algo['mode'] == self.ALGO_STATIC and not get_static:
+                continue
+            res[ID] = self._generate_many(algo, macs)
+        return res
 
-    def pin28(self, mac):
-        return (mac.integer & 0xFFFFFFF)
+    def getAll_table(self, macs, get_static=True):
+        '''
+        Get all WPS pin's for many MACs as a compact table,
+        without per-pin Python objects
+        Returns (algo IDs, pins): the pin of the i-th MAC for the j-th algo is
+        pins[i, j] of NumPy uint32 array if NumPy is available,
+        otherwise pins[i * len(IDs) + j] of array.array('I').
+        Empty PIN is omitted
+        '''
+        columns = self.getAll_many(macs, get_static)
+        ids = tuple(columns)
+        np = _import_numpy()
+        if np is not None:
+            return ids, np.stack(list(columns.values()), axis=1)
+        from array import array
+        width = len(ids)
+        count = len(columns[ids[0]]) if ids else 0
+        pins = array('I', bytes(4 * count * width))
+        for j, column in enumerate(columns.values()):
+            pins[j::width] = array('I', column)
+        return ids, pins
 
-    def pin32(self, mac):
-        return (mac.integer % 0x100000000)
+    def sweep(self, start_mac, count, algos=None):
+        '''
+        Lazily generate pins for the contiguous MAC range,
+        e.g. every NIC under the OUI or ±N around the observed MAC
+        @start_mac — first MAC address (integer, string or NetworkAddress)
+        @count — number of MACs
+        @algos — algo IDs, all except the empty pin by default
+        Yields (MAC as integer, algo ID, 8 digit pin as integer) tuples, MAC by MAC.
+        Linear algorithms are updated incrementally from the previous MAC
+        '''
+        start = self._parse(start_mac)
+        if start < 0 or count < 0 or start + count > 0x1000000000000:
+            raise ValueError('MAC range is out of the address space')
+        registry = self._tables[0]
+        if algos is None:
+            algos = [ID for ID, algo in registry.items() if algo['mode'] != ALGO_EMPTY]
+        plan = []
+        for ID in algos:
+            if ID not in registry:
+                raise ValueError('Invalid WPS pin algorithm')
+            algo = registry[ID]
+            if algo['mode'] == ALGO_EMPTY:
+                raise ValueError('Empty PIN can not be represented as integer')
+            if algo['mode'] == ALGO_STATIC:
+                pin = algo['gen'](0) % 10000000
+                plan.append((ID, None, pin * 10 + self.checksum(pin)))
+            else:
+                plan.append((ID, algo['gen'], algo.get('step')))
+        return self._sweep(start, count, plan)
 
-    def pin36(self, mac):
-        return (mac.integer % 0x1000000000)
+    def _sweep(self, start, count, plan):
+        checksum = self.checksum
+        # Current pins of the linear algorithms, by plan index
+        values = [0] * len(plan)
+        for mac in range(start, start + count):
+            # Linear algorithms are recomputed at the NIC wrap
+            reseed = mac == start or not mac & 0xFFFFFF
+            for i, (ID, gen, step) in enumerate(plan):
+                if gen is None:
+                    yield mac, ID, step
+                    continue
+                if step is None:
+                    pin = gen(mac) % 10000000
+                elif reseed:
+                    pin = values[i] = gen(mac) % 10000000
+                else:
+                    pin = values[i] = (values[i] + step) % 10000000
+                yield mac, ID, pin * 10 + checksum(pin)
 
-    def pin40(self, mac):
-        return (mac.integer % 0x10000000000)
+    def generate_parallel(self, macs, get_all=False, jobs=None, chunksize=1000):
+        '''
+        Get pins for many MACs using a pool of worker processes
+        @macs — iterable of MAC address strings (e.g. file object)
+        @get_all — get all pins instead of the suggested ones
+        @jobs — number of worker processes, one per CPU by default
+        @chunksize — number of MACs sent to a worker at once
+        Yields (MAC, pins) tuples in input order, like stream_pins.
+        Only a few chunks per worker are held in memory at a time
+        '''
+        import itertools
+        import multiprocessing
+        import os
+        from collections import deque
 
-    def pin44(self, mac):
-        return (mac.integer % 0x100000000000)
+        jobs = jobs or os.cpu_count() or 1
+        window = 4 * jobs
+        macs = iter(macs)
+        pindb = self.pindb.path if self.pindb is not None else None
+        data = self.data.path if self.data is not None else None
+        with multiprocessing.Pool(jobs, _init_worker, (get_all, pindb, data)) as pool:
+            pending = deque()
+            while True:
+                chunk = list(itertools.islice(macs, chunksize))
+                if chunk:
+                    pending.append(pool.apply_async(_worker_chunk, (chunk,)))
+                while pending and (len(pending) >= window or not chunk):
+                    for record in pending.popleft().get():
+                        yield record
+                if not chunk:
+                    break
 
-    def pin48(self, mac):
-        return mac.integer
+    def _suggest(self, mac, tables=None):
+        '''
+        Get algos suggestions for single MAC
+        @tables — the generator tables to use, the current ones by default
+        Returns the algo ID
+        '''
+        # Canonical form, so every notation of the MAC matches the same prefixes
+        mac = '{:012X}'.format(_mac_integer(mac))
+        index = (tables or self._tables)[1]
+        return (index or _get_suggest_index()).lookup(mac)
 
-    def pin24rh(self, mac):
-        b = [i for i in mac.string.split(':')]
-        return int(''.join(b[-1:-4:-1]), 16)
-
-    def pin32rh(self, mac):
-        b = [i for i in mac.string.split(':')]
-        return int(''.join(b[-1:-5:-1]), 16)
-
-    def pin48rh(self, mac):
-        b = [i for i in mac.string.split(':')]
-        return int(''.join(b[-1::-1]), 16)
-
-    def pin24rn(self, mac):
-        return int(mac.string.replace(':', '')[-1:-7:-1], 16)
-
-    def pin32rn(self, mac):
-        return int(mac.string.replace(':', '')[-1:-9:-1], 16)
-
-    def pin48rn(self, mac):
-        return int(mac.string.replace(':', '')[-1::-1], 16)
-
-    def pin24rb(self, mac):
-        return int(bin(mac.integer)[2:].zfill(24)[:-25:-1], 2)
-
-    def pin32rb(self, mac):
-        return int(bin(mac.integer)[2:].zfill(32)[:-33:-1], 2)
-
-    def pin48rb(self, mac):
-        return int(bin(mac.integer)[2:].zfill(48)[::-1], 2)
-
-    def pinDLink(self, mac):
-        # Get the NIC part
-        nic = mac.integer & 0xFFFFFF
-        # Calculating pin
-        pin = nic ^ 0x55AA55
-        pin ^= (((pin & 0xF) << 4) +
-                ((pin & 0xF) << 8) +
-                ((pin & 0xF) << 12) +
-                ((pin & 0xF) << 16) +
-                ((pin & 0xF) << 20))
-        pin %= int(10e6)
-        if pin < int(10e5):
-            pin += ((pin % 9) * int(10e5)) + int(10e5)
-        return pin
-
-    def pinDLink1(self, mac):
-        mac.integer += 1
-        return self.pinDLink(mac)
-
-    def pinASUS(self, mac):
-        b = [int(i, 16) for i in mac.string.split(':')]
-        pin = ''
-        for i in range(7):
-            pin += str((b[i % 6] + b[5]) % (10 - (i + b[1] + b[2] + b[3] + b[4] + b[5]) % 7))
-        return int(pin)
-
-    def pinAirocon(self, mac):
-        b = [int(i, 16) for i in mac.string.split(':')]
-        pin = ((b[0] + b[1]) % 10)\
-        + (((b[5] + b[0]) % 10) * 10)\
-        + (((b[4] + b[5]) % 10) * 100)\
-        + (((b[3] + b[4]) % 10) * 1000)\
-        + (((b[2] + b[3]) % 10) * 10000)\
-        + (((b[1] + b[2]) % 10) * 100000)\
-        + (((b[0] + b[1]) % 10) * 1000000)
-        return pin
-
-    def pinInvNIC(self, mac):
-        nic = mac.integer & 0xFFFFFF
-        pin = ~nic & 0xFFFFFF
-        return pin
-
-    def pinNIC2(self, mac):
-        nic = mac.integer & 0xFFFFFF
-        pin = nic * 2
-        return pin
-
-    def pinNIC3(self, mac):
-        nic = mac.integer & 0xFFFFFF
-        pin = nic * 3
-        return pin
-
-    def pinOUIaddNIC(self, mac):
-        mac = mac.string.replace(':', '')
-        oui = int(mac[:6], 16)
-        nic = int(mac[6:], 16)
-        pin = (oui + nic) % int(10e6)
-        return pin
-
-    def pinOUIsubNIC(self, mac):
-        mac = mac.string.replace(':', '')
-        oui = int(mac[:6], 16)
-        nic = int(mac[6:], 16)
-        pin = oui - nic if nic < oui else (oui + 0x1000000 - nic) & 0xFFFFFF
-        return pin
-
-    def pinOUIxorNIC(self, mac):
-        mac = mac.string.replace(':', '')
-        oui = int(mac[:6], 16)
-        nic = int(mac[6:], 16)
-        pin = oui ^ nic
-        return pin
+
+def _method(gen):
+    '''Returns the WPSpin method calling gen with the MAC given as integer, string or NetworkAddress'''
+    import functools
+
+    @functools.wraps(gen)
+    def method(self, mac):
+        return gen(_mac_integer(mac))
+    return method
+
+
+# Generator methods of the built-in MAC-based algos: WPSpin().pin24(mac) etc.
+for _ID, _algo in ALGORITHMS.items():
+    if _algo['mode'] == ALGO_MAC:
+        setattr(WPSpin, _ID, _method(_algo['gen']))
+del _ID, _algo
+
+
+def _parse_line(mac):
+    '''
+    Strictly parse MAC address read from the input:
+    exactly 12 hex digits, optionally separated by ':', '-' or '.'
+    Returns the MAC as integer
+    '''
+    digits = mac.replace(':', '').replace('-', '').replace('.', '')
+    if len(digits) != 12 or digits.strip('0123456789abcdefABCDEF'):
+        raise ValueError('Invalid MAC address: {}'.format(mac))
+    return int(digits, 16)
+
+
+def stream_pins(lines, get_all=False, generator=None):
+    '''
+    Lazily generate pins for MAC addresses read line by line
+    @lines — iterable of lines (e.g. file object), one MAC per line
+    @get_all — get all pins instead of the suggested ones
+    Yields (MAC, pins) tuples, pins as returned by getAll/getSuggested.
+    Invalid MACs are reported to stderr and skipped
+    '''
+    import sys
+
+    if generator is None:
+        generator = WPSpin()
+    for line in lines:
+        mac = line.strip()
+        if not mac:
+            continue
+        try:
+            _parse_line(mac)
+            if get_all:
+                pins = generator.getAll(mac)
+            else:
+                pins = generator.getSuggested(mac)
+        except ValueError:
+            print('Skipping invalid MAC address: {}'.format(mac), file=sys.stderr)
+            continue
+        yield mac, pins
+
+
+# Per-process state of generate_parallel workers
+_worker_generator = None
+_worker_get_all = False
+
+
+def _init_worker(get_all, pindb=None, data=None):
+    '''Build the generator and its tables once per worker process'''
+    global _worker_generator, _worker_get_all
+    _worker_generator = WPSpin(pindb, data=data)
+    _worker_get_all = get_all
+    _get_suggest_index()
+    _get_checksum_table()
+
+
+def _worker_chunk(lines):
+    return list(stream_pins(lines, _worker_get_all, _worker_generator))
+
+
+def _report_throughput(records, out):
+    '''Pass the records through and report the processing rate at the end'''
+    start = time.time()
+    count = 0
+    for record in records:
+        count += 1
+        yield record
+    elapsed = time.time() - start
+    print('Processed {} MAC(s) in {:.2f} s ({:.0f} MAC/s)'.format(
+        count, elapsed, count / elapsed if elapsed else 0), file=out)
+
+
+def write_records(records, out, fmt='tsv', flush=False):
+    '''
+    Write (MAC, pins) records one per line
+    @fmt — 'tsv' or 'csv' (MAC followed by the pins),
+    'json' (JSON Lines: {"mac": MAC, "pins": [{"id", "name", "pin"}, …]})
+    @flush — flush the output after every record
+    '''
+    if fmt == 'json':
+        import json
+
+        def write(mac, pins):
+            out.write(json.dumps({'mac': mac, 'pins': [dict(pin) for pin in pins]}, ensure_ascii=False) + '\n')
+    else:
+        import csv
+        writer = csv.writer(out, delimiter='\t' if fmt == 'tsv' else ',', lineterminator='\n')
+
+        def write(mac, pins):
+            writer.writerow([mac] + [pin['pin'] for pin in pins])
+
+    for mac, pins in records:
+        write(mac, pins)
+        if flush:
+            out.flush()
 
 
 def main():
+    import sys
+
+    # Fast path for the common `wpspin [-A] MAC` invocation, without argparse
+    argv = sys.argv[1:]
+    timing = '--timing' in argv
+    argv = [arg for arg in argv if arg != '--timing']
+    if len(argv) == 1 and not argv[0].startswith('-'):
+        return _run_single(argv[0], timing=timing)
+    if len(argv) == 2 and argv[0] in ('-A', '--get-all') and not argv[1].startswith('-'):
+        return _run_single(argv[1], get_all=True, timing=timing)
+
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -392,6 +1228,7 @@ def main():
     parser.add_argument(
         'mac',
         type=str,
+        nargs='?',
         help='target MAC address to generate PIN code. Example: 11:22:33:44:55:66'
         )
     parser.add_argument(
@@ -399,14 +1236,151 @@ def main():
         action='store_true',
         help='get all PIN codes in addition to the suggested ones for a single MAC'
         )
+    parser.add_argument(
+        '-i', '--input',
+        metavar='FILE',
+        help='read MAC addresses line by line from the file (- for stdin) and stream the PINs'
+        )
+    parser.add_argument(
+        '-f', '--format',
+        choices=('tsv', 'csv', 'json', 'bin'),
+        default='tsv',
+        help='output format for --input mode: tsv, csv, json (JSON Lines) or bin '
+        '(binary table of all the non-empty PINs, see wpspin.columnar). Default: %(default)s'
+        )
+    parser.add_argument(
+        '-j', '--jobs',
+        metavar='N',
+        type=int,
+        help='number of worker processes for --input mode (0 — one per CPU)'
+        )
+    parser.add_argument(
+        '--db',
+        metavar='FILE',
+        help='precomputed PIN database to serve the covered MACs from (see wpspin.pindb)'
+        )
+    parser.add_argument(
+        '--serve',
+        metavar='ADDRESS',
+        help='serve PINs over Unix socket path or HOST:PORT, one JSON line per request'
+        )
+    parser.add_argument(
+        '--data',
+        metavar='FILE',
+        help='external algorithm and OUI database (JSON or TOML, see wpspin.datafile), '
+        'reloaded on change in --serve mode'
+        )
+    parser.add_argument(
+        '--cache-size',
+        metavar='N',
+        type=int,
+        default=0,
+        help='cache results of the last N MACs in --input and --serve modes'
+        )
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='print the attempt plan grouped by the first half of the PIN for a single MAC'
+        )
+    parser.add_argument(
+        '--timing',
+        action='store_true',
+        help='report process startup, init and compute time to stderr'
+        )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='report calls and time per generation stage and algorithm to stderr'
+        )
 
     args = parser.parse_args()
 
-    pinGen = WPSpin()
-    if args.get_all:
-        pins = pinGen.getAll(args.mac)
+    if args.serve is not None:
+        import asyncio
+        from .aio import AsyncWPSpin, serve
+        asyncio.run(serve(args.serve, AsyncWPSpin(WPSpin(args.db, cache_size=args.cache_size, data=args.data))))
+        return
+    if args.input is not None:
+        if args.profile and args.jobs is not None:
+            parser.error('--profile is not supported with --jobs')
+        if args.format == 'bin' and args.jobs is not None:
+            parser.error('bin format is not supported with --jobs')
+        if args.input == '-':
+            stream = sys.stdin
+        else:
+            stream = open(args.input, encoding='utf-8')
+        with stream:
+            if args.format == 'bin':
+                from .columnar import write_table
+                pinGen = WPSpin(args.db, profile=args.profile, data=args.data)
+                write_table(stream, sys.stdout.buffer, pinGen)
+            elif args.jobs is None:
+                pinGen = WPSpin(args.db, cache_size=args.cache_size, profile=args.profile, data=args.data)
+                records = stream_pins(stream, args.get_all, pinGen)
+            else:
+                records = _report_throughput(
+                    WPSpin(args.db, data=args.data).generate_parallel(stream, args.get_all, args.jobs or None),
+                    sys.stderr
+                )
+            if args.format != 'bin':
+                write_records(records, sys.stdout, args.format, flush=(args.input == '-'))
+        if args.profile:
+            pinGen.profiler.report(sys.stderr)
+        return
+    if args.mac is None:
+        parser.error('either MAC or --input is required')
+
+    if args.plan:
+        _print_plan(WPSpin(args.db, data=args.data).getPlan(args.mac, args.get_all))
+        return
+    _run_single(args.mac, args.get_all, args.db, args.timing, args.profile, args.data)
+
+
+def _print_plan(plan):
+    if plan['empty'] is not None:
+        print('Empty PIN: try it separately, it is not checked by halves')
+    if not plan['pins']:
+        if plan['empty'] is None:
+            print('No PINs found — try to get all PINs (-A)')
+        return
+    print('Found {} PIN(s) in {} first half group(s)'.format(plan['pins'], len(plan['groups'])))
+    print('Expected exchanges: {:.2f} (one by one: {:.2f}), at most {}'.format(
+        plan['expected'], plan['naive'], plan['max']))
+    print('{:<6} {:<10} {:<8} {}'.format('Half', 'PIN', 'Score', 'Name'))
+    for group in plan['groups']:
+        for item in group['pins']:
+            print('{:<6} {:<10} {:<8.4f} {}'.format(group['half'], item['pin'], item['score'], ', '.join(item['names'])))
+
+
+def _process_uptime():
+    '''
+    Wall time since the process start in seconds, including the interpreter startup.
+    Linux only (from /proc, 10 ms resolution), None elsewhere
+    '''
+    import os
+
+    try:
+        with open('/proc/self/stat') as file:
+            # Fields after the command name start from the 3rd one, starttime is the 22nd
+            started = int(file.read().rpartition(')')[2].split()[19])
+        with open('/proc/uptime') as file:
+            uptime = float(file.read().split()[0])
+        return uptime - started / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _run_single(mac, get_all=False, db=None, timing=False, profile=False, data=None):
+    import sys
+
+    start = time.perf_counter()
+    pinGen = WPSpin(db, profile=profile, data=data)
+    init = time.perf_counter()
+    if get_all:
+        pins = pinGen.getAll(mac)
     else:
-        pins = pinGen.getSuggested(args.mac)
+        pins = pinGen.getSuggested(mac)
+    done = time.perf_counter()
 
     if pins:
         print('Found {} PIN(s)'.format(len(pins)))
@@ -415,3 +1389,17 @@ def main():
             print('{:<10} {}'.format(pin['pin'], pin['name']))
     else:
         print('No PINs found — try to get all PINs (-A)')
+    if timing:
+        uptime = _process_uptime()
+        print('Timing: wpspin.wpspin module body {:.2f} ms, init {:.2f} ms, compute {:.2f} ms'.format(
+            _import_time * 1000, (init - start) * 1000, (done - init) * 1000), file=sys.stderr)
+        print('Process CPU time {:.2f} ms, wall time since process start {} '
+              '(both include the interpreter startup and all imports)'.format(
+                time.process_time() * 1000,
+                '{:.0f} ms'.format(uptime * 1000) if uptime is not None else 'unknown'), file=sys.stderr)
+    if profile:
+        pinGen.profiler.report(sys.stderr)
+
+
+# Execution time of this module body, reported by --timing
+_import_time = time.perf_counter() - _import_start